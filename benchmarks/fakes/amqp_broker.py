@@ -0,0 +1,127 @@
+"""In-memory stand-in for RabbitMQ, shared between processes through a multiprocessing manager.
+
+The load-test harness starts it; the fake `pika` package in this directory talks
+to it. It implements just what the services use: the default exchange, durable
+queue declarations, per-message TTL with dead-lettering back to another queue,
+prefetch, (multi-)acks and requeue of unacked messages when a channel closes.
+"""
+import itertools
+import os
+import threading
+from collections import deque
+from multiprocessing.managers import BaseManager
+
+ADDRESS_ENV = 'FAKE_AMQP_ADDRESS'
+AUTHKEY_ENV = 'FAKE_AMQP_AUTHKEY'
+
+
+class Broker:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._arguments = {}
+        self._unacked = {}
+        self._tags = itertools.count(1)
+        self.published = 0
+
+    def declare(self, queue, arguments=None):
+        """Create a queue if needed; returns its ready message count"""
+        with self._cond:
+            self._queues.setdefault(queue, deque())
+            if arguments:
+                self._arguments[queue] = dict(arguments)
+            return len(self._queues[queue])
+
+    def publish(self, queue, body, properties):
+        """Route a message by queue name; False when no such queue exists"""
+        with self._cond:
+            if queue not in self._queues:
+                return False
+            self.published += 1
+            arguments = self._arguments.get(queue, {})
+            if 'x-message-ttl' in arguments:
+                # Dead-letter to the configured queue once the TTL expires
+                timer = threading.Timer(
+                    arguments['x-message-ttl'] / 1000,
+                    self.publish,
+                    args=(arguments['x-dead-letter-routing-key'], body, properties)
+                )
+                timer.daemon = True
+                timer.start()
+                return True
+            self._queues[queue].append((body, properties))
+            self._cond.notify_all()
+            return True
+
+    def fetch(self, channel_id, queue, max_count, timeout):
+        """Take up to max_count messages, waiting up to timeout seconds for the first"""
+        with self._cond:
+            ready = self._queues.setdefault(queue, deque())
+            if not ready and timeout > 0:
+                self._cond.wait_for(lambda: ready, timeout)
+            deliveries = []
+            while ready and len(deliveries) < max_count:
+                body, properties = ready.popleft()
+                tag = next(self._tags)
+                self._unacked[(channel_id, tag)] = (queue, body, properties)
+                deliveries.append((tag, body, properties))
+            return deliveries
+
+    def ack(self, channel_id, delivery_tag, multiple=False):
+        with self._cond:
+            if multiple:
+                for key in [k for k in self._unacked if k[0] == channel_id and k[1] <= delivery_tag]:
+                    del self._unacked[key]
+            else:
+                self._unacked.pop((channel_id, delivery_tag), None)
+
+    def release(self, channel_id):
+        """Requeue everything a closed channel left unacknowledged"""
+        with self._cond:
+            keys = sorted(k for k in self._unacked if k[0] == channel_id)
+            for key in reversed(keys):
+                queue, body, properties = self._unacked.pop(key)
+                self._queues[queue].appendleft((body, properties))
+            if keys:
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'published': self.published,
+                'queues': {name: len(ready) for name, ready in self._queues.items()},
+                'unacked': len(self._unacked)
+            }
+
+
+_broker = None
+
+
+def _get_broker():
+    global _broker
+    if _broker is None:
+        _broker = Broker()
+    return _broker
+
+
+class BrokerManager(BaseManager):
+    pass
+
+
+BrokerManager.register('broker', callable=_get_broker)
+
+
+def start(authkey):
+    """Start the broker in a child process; returns (manager, 'host:port')"""
+    manager = BrokerManager(address=('127.0.0.1', 0), authkey=authkey)
+    manager.start()
+    host, port = manager.address
+    return manager, f"{host}:{port}"
+
+
+def connect():
+    """Proxy to the broker named by FAKE_AMQP_ADDRESS / FAKE_AMQP_AUTHKEY"""
+    host, port = os.environ[ADDRESS_ENV].rsplit(':', 1)
+    manager = BrokerManager(address=(host, int(port)), authkey=os.environ[AUTHKEY_ENV].encode())
+    manager.connect()
+    return manager.broker()
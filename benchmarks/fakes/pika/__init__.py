@@ -0,0 +1,162 @@
+"""Minimal drop-in for the parts of pika the services use, backed by benchmarks/fakes/amqp_broker.py.
+
+Put benchmarks/fakes first on PYTHONPATH (the load-test harness does this) and
+set FAKE_AMQP_ADDRESS / FAKE_AMQP_AUTHKEY; connection parameters are ignored.
+"""
+import time
+import uuid
+
+import amqp_broker
+from pika import exceptions
+
+__version__ = 'fake'
+
+
+class PlainCredentials:
+    def __init__(self, username, password, erase_on_connect=False):
+        self.username = username
+        self.password = password
+
+
+class ConnectionParameters:
+    def __init__(self, host='localhost', port=5672, credentials=None, **kwargs):
+        self.host = host
+        self.port = port
+        self.credentials = credentials
+        self.options = kwargs
+
+
+class BasicProperties:
+    def __init__(self, content_type=None, delivery_mode=None, headers=None, **kwargs):
+        self.content_type = content_type
+        self.delivery_mode = delivery_mode
+        self.headers = headers
+
+    def to_dict(self):
+        return {
+            'content_type': self.content_type,
+            'delivery_mode': self.delivery_mode,
+            'headers': self.headers
+        }
+
+
+class _Method:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class _Frame:
+    def __init__(self, **fields):
+        self.method = _Method(**fields)
+
+
+class BlockingChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.channel_id = uuid.uuid4().hex
+        self.is_open = True
+        self._prefetch = 0
+        self._consumers = []
+        self._outstanding = set()
+
+    def confirm_delivery(self):
+        # The fake broker applies publishes synchronously, so every publish is confirmed
+        pass
+
+    def queue_declare(self, queue, passive=False, durable=False, exclusive=False,
+                      auto_delete=False, arguments=None):
+        count = self.connection._call('declare', queue, arguments)
+        return _Frame(queue=queue, message_count=count, consumer_count=len(self._consumers))
+
+    def basic_qos(self, prefetch_size=0, prefetch_count=0, global_qos=False):
+        self._prefetch = prefetch_count
+
+    def basic_consume(self, queue, on_message_callback, auto_ack=False, **kwargs):
+        self._consumers.append((queue, on_message_callback, auto_ack))
+        return f"ctag-{len(self._consumers)}"
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        if isinstance(body, str):
+            body = body.encode()
+        properties = (properties or BasicProperties()).to_dict()
+        routed = self.connection._call('publish', routing_key, body, properties)
+        if mandatory and not routed:
+            raise exceptions.UnroutableError([])
+
+    def basic_get(self, queue, auto_ack=False):
+        deliveries = self.connection._call('fetch', self.channel_id, queue, 1, 0)
+        if not deliveries:
+            return None, None, None
+        tag, body, properties = deliveries[0]
+        if auto_ack:
+            self.connection._call('ack', self.channel_id, tag, False)
+        return _Method(delivery_tag=tag, routing_key=queue), BasicProperties(**properties), body
+
+    def basic_ack(self, delivery_tag=0, multiple=False):
+        self.connection._call('ack', self.channel_id, delivery_tag, multiple)
+        if multiple:
+            self._outstanding = {tag for tag in self._outstanding if tag > delivery_tag}
+        else:
+            self._outstanding.discard(delivery_tag)
+
+    def _deliver(self, time_limit):
+        """Hand queued messages to consumers, waiting up to time_limit for the first"""
+        for queue, callback, auto_ack in self._consumers:
+            room = self._prefetch - len(self._outstanding) if self._prefetch else 1000
+            if room <= 0:
+                continue
+            deliveries = self.connection._call('fetch', self.channel_id, queue, room, time_limit)
+            for tag, body, properties in deliveries:
+                if auto_ack:
+                    self.connection._call('ack', self.channel_id, tag, False)
+                else:
+                    self._outstanding.add(tag)
+                method = _Method(delivery_tag=tag, routing_key=queue, redelivered=False)
+                callback(self, method, BasicProperties(**properties), body)
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            self.connection._call('release', self.channel_id)
+
+
+class BlockingConnection:
+    def __init__(self, parameters=None):
+        try:
+            self._broker = amqp_broker.connect()
+        except (OSError, EOFError) as e:
+            raise exceptions.AMQPConnectionError(str(e))
+        self._channels = []
+        self.is_open = True
+
+    def _call(self, name, *args):
+        if not self.is_open:
+            raise exceptions.ConnectionClosed('Connection is closed')
+        try:
+            return getattr(self._broker, name)(*args)
+        except (OSError, EOFError) as e:
+            self.is_open = False
+            raise exceptions.AMQPConnectionError(str(e))
+
+    @property
+    def is_closed(self):
+        return not self.is_open
+
+    def channel(self):
+        channel = BlockingChannel(self)
+        self._channels.append(channel)
+        return channel
+
+    def process_data_events(self, time_limit=0):
+        for channel in self._channels:
+            if channel._consumers:
+                channel._deliver(time_limit or 0)
+
+    def sleep(self, duration):
+        time.sleep(duration)
+
+    def close(self):
+        if self.is_open:
+            for channel in self._channels:
+                channel.close()
+            self.is_open = False
@@ -0,0 +1,26 @@
+class AMQPError(Exception):
+    pass
+
+
+class AMQPConnectionError(AMQPError):
+    pass
+
+
+class AMQPChannelError(AMQPError):
+    pass
+
+
+class ConnectionClosed(AMQPConnectionError):
+    pass
+
+
+class ChannelClosed(AMQPChannelError):
+    pass
+
+
+class UnroutableError(AMQPChannelError):
+    pass
+
+
+class NackError(AMQPChannelError):
+    pass
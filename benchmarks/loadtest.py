@@ -0,0 +1,511 @@
+"""Boot the gateway, inventory and billing services locally and measure them under load.
+
+Usage:
+    python benchmarks/loadtest.py --concurrency 32 --duration 30 --output results/run.json
+    python benchmarks/loadtest.py --baseline results/run.json          # show deltas vs an earlier run
+    python benchmarks/loadtest.py --replay traffic.jsonl               # replay recorded requests
+    CACHE_ENABLED=false PROXY_PASSTHROUGH=false python benchmarks/loadtest.py --requests 500 --check
+
+By default every service runs as a local process against a throwaway SQLite
+database, and RabbitMQ is replaced by the in-memory broker in benchmarks/fakes
+(the fake `pika` package is put first on PYTHONPATH). --inventory-db/--billing-db
+take SQLAlchemy URLs for a local Postgres with init.sql applied, and
+--rabbitmq-host uses a real broker instead of the fake.
+
+The services inherit the environment, so gateway settings (CACHE_ENABLED,
+PROXY_PASSTHROUGH, COALESCE_ENABLED, ...) can be varied per run; --check turns a
+short run into a smoke test that fails on any 5xx or connection error.
+
+A replay file holds one JSON object per line:
+    {"method": "GET", "path": "/api/movies/12"}
+    {"method": "POST", "path": "/api/orders", "body": {"user_id": 1, "movie_id": 3, "quantity": 1}}
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRCS = os.path.join(ROOT, 'srcs')
+FAKES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakes')
+
+# Orders placed by the harness use user ids from here up, one per order, so the
+# order-to-row tracker can match billing rows back to the request that made them
+ORDER_USER_BASE = 10_000_000
+
+DEFAULT_MIX = {
+    'list_movies': 25,
+    'get_movie': 30,
+    'multi_get_movies': 10,
+    'search_movies': 10,
+    'create_order': 15,
+    'user_orders': 5,
+    'daily_stats': 5
+}
+
+SETUP_SCRIPT = '''
+import os
+from sqlalchemy import insert, text
+from app import create_app, db
+app = create_app()
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.connect() as conn:
+            conn.execute(text('PRAGMA journal_mode=WAL'))
+        db.create_all()
+    movies = int(os.environ.get('SEED_MOVIES', '0'))
+    if movies:
+        from app.models import Movie
+        if not db.session.scalar(db.select(Movie.id).limit(1)):
+            db.session.execute(insert(Movie), [
+                {'title': f'Benchmark Movie {i}', 'description': f'Seeded movie number {i} for load tests',
+                 'price': 5 + i % 20, 'stock': 10_000_000}
+                for i in range(movies)
+            ])
+            db.session.commit()
+'''
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    ordered = sorted(latencies)
+    ms = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        'count': len(ordered),
+        'throughput_rps': round(len(ordered) / elapsed, 1) if elapsed else None,
+        'p50_ms': ms(percentile(ordered, 0.50)),
+        'p95_ms': ms(percentile(ordered, 0.95)),
+        'p99_ms': ms(percentile(ordered, 0.99)),
+        'max_ms': ms(ordered[-1] if ordered else None)
+    }
+
+
+class Cluster:
+    """The three services running as local processes"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix='loadtest-')
+        self.processes = []
+        self.broker_manager = None
+        self.gateway_url = None
+        self.billing_url = None
+
+    def __enter__(self):
+        try:
+            self.start()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def base_env(self):
+        env = dict(os.environ)
+        if self.args.rabbitmq_host:
+            env['RABBITMQ_HOST'] = self.args.rabbitmq_host
+        else:
+            env['PYTHONPATH'] = os.pathsep.join(filter(None, [FAKES, env.get('PYTHONPATH')]))
+            env['FAKE_AMQP_ADDRESS'] = self.broker_address
+            env['FAKE_AMQP_AUTHKEY'] = self.broker_authkey
+        return env
+
+    def start(self):
+        if not self.args.rabbitmq_host:
+            if self.args.engine == 'async':
+                raise SystemExit('--engine async publishes with aio-pika; pass --rabbitmq-host')
+            sys.path.insert(0, FAKES)
+            import amqp_broker
+            self.broker_authkey = secrets.token_hex(16)
+            self.broker_manager, self.broker_address = amqp_broker.start(self.broker_authkey.encode())
+
+        inventory_db = self.args.inventory_db or f"sqlite:///{os.path.join(self.workdir, 'inventory.db')}"
+        billing_db = self.args.billing_db or f"sqlite:///{os.path.join(self.workdir, 'billing.db')}"
+        self.setup_database('inventory-app', inventory_db, seed_movies=self.args.movies)
+        self.setup_database('billing-app', billing_db)
+
+        inventory_port, billing_port, gateway_port = free_port(), free_port(), free_port()
+        inventory_url = f"http://127.0.0.1:{inventory_port}"
+        self.billing_url = f"http://127.0.0.1:{billing_port}"
+        self.gateway_url = f"http://127.0.0.1:{gateway_port}"
+
+        self.spawn('inventory-app', {'APP_PORT': str(inventory_port), 'DATABASE_URL': inventory_db})
+        self.spawn('billing-app', {'APP_PORT': str(billing_port), 'DATABASE_URL': billing_db})
+        self.spawn('api-gateway-app', {
+            'APP_PORT': str(gateway_port),
+            'GATEWAY_ENGINE': self.args.engine,
+            'INVENTORY_SERVICE_URL': inventory_url,
+            'BILLING_SERVICE_URL': self.billing_url,
+            'LOG_FILE': os.path.join(self.workdir, 'gateway.log'),
+            'RABBITMQ_SPOOL_FILE': os.path.join(self.workdir, 'order_spool.jsonl')
+        })
+
+        self.wait_ready(f"{inventory_url}/api/movies?limit=1")
+        self.wait_ready(f"{self.billing_url}/api/orders?limit=1")
+        self.wait_ready(f"{self.gateway_url}/health")
+
+    def setup_database(self, service, url, seed_movies=0):
+        env = dict(self.base_env(), DATABASE_URL=url, SEED_MOVIES=str(seed_movies))
+        subprocess.run([sys.executable, '-c', SETUP_SCRIPT], cwd=os.path.join(SRCS, service),
+                       env=env, check=True)
+
+    def spawn(self, service, extra_env):
+        log = open(os.path.join(self.workdir, f"{service}.log"), 'w')
+        process = subprocess.Popen(
+            [sys.executable, 'server.py'],
+            cwd=os.path.join(SRCS, service),
+            env=dict(self.base_env(), **extra_env),
+            stdout=log,
+            stderr=subprocess.STDOUT
+        )
+        self.processes.append((service, process, log))
+
+    def wait_ready(self, url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for service, process, _ in self.processes:
+                if process.poll() is not None:
+                    raise SystemExit(f"{service} exited; see {self.workdir}/{service}.log")
+            try:
+                if requests.get(url, timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise SystemExit(f"Timed out waiting for {url}; logs are in {self.workdir}")
+
+    def broker_stats(self):
+        if self.broker_manager is None:
+            return None
+        return self.broker_manager.broker().stats()
+
+    def stop(self):
+        for _, process, log in self.processes:
+            process.terminate()
+        for _, process, log in self.processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+        if self.broker_manager is not None:
+            self.broker_manager.shutdown()
+        if self.args.keep_logs:
+            print(f"Service logs kept in {self.workdir}")
+        else:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class TrafficSource:
+    """Synthesized request mix, or a replay file cycled in order"""
+
+    def __init__(self, args):
+        self.movies = args.movies
+        self.mix = dict(DEFAULT_MIX)
+        for part in filter(None, (args.mix or '').split(',')):
+            name, weight = part.split('=')
+            if name not in DEFAULT_MIX:
+                raise SystemExit(f"Unknown route in --mix: {name}")
+            self.mix[name] = int(weight)
+        self.order_ids = itertools.count(ORDER_USER_BASE)
+        self.lock = threading.Lock()
+        self.replay = None
+        if args.replay:
+            with open(args.replay) as f:
+                self.replay = [json.loads(line) for line in f if line.strip()]
+            self.replay_index = itertools.cycle(range(len(self.replay)))
+
+    def next_request(self, rng):
+        """Return (label, method, path, body, order_user_id)"""
+        if self.replay is not None:
+            with self.lock:
+                entry = self.replay[next(self.replay_index)]
+            method = entry.get('method', 'GET').upper()
+            label = entry.get('label') or f"{method} {entry['path'].split('?')[0]}"
+            return label, method, entry['path'], entry.get('body'), None
+
+        name = rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        movie_id = rng.randint(1, self.movies)
+        if name == 'list_movies':
+            return 'GET /api/movies', 'GET', '/api/movies?limit=50', None, None
+        if name == 'get_movie':
+            return 'GET /api/movies/{id}', 'GET', f'/api/movies/{movie_id}', None, None
+        if name == 'multi_get_movies':
+            ids = ','.join(str(rng.randint(1, self.movies)) for _ in range(10))
+            return 'GET /api/movies?ids=', 'GET', f'/api/movies?ids={ids}', None, None
+        if name == 'search_movies':
+            return 'GET /api/movies/search', 'GET', f'/api/movies/search?q=movie {movie_id}', None, None
+        if name == 'create_order':
+            with self.lock:
+                user_id = next(self.order_ids)
+            body = {'user_id': user_id, 'movie_id': movie_id, 'quantity': rng.randint(1, 3)}
+            return 'POST /api/orders', 'POST', '/api/orders', body, user_id
+        if name == 'user_orders':
+            return 'GET /api/orders/user/{id}', 'GET', f'/api/orders/user/{rng.randint(1, 1000)}?limit=20', None, None
+        return 'GET /api/stats/daily', 'GET', '/api/stats/daily', None, None
+
+
+class OrderTracker:
+    """Measures how long an accepted order takes to appear as a billing row"""
+
+    def __init__(self, billing_url, interval):
+        self.billing_url = billing_url
+        self.interval = interval
+        self.accepted = {}
+        self.latencies = []
+        self.lock = threading.Lock()
+        self.after_id = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def accept(self, user_id, accepted_at):
+        with self.lock:
+            self.accepted[user_id] = accepted_at
+
+    def pending(self):
+        with self.lock:
+            return len(self.accepted)
+
+    def run(self):
+        session = requests.Session()
+        while not self.stopped.is_set():
+            try:
+                response = session.get(
+                    f"{self.billing_url}/api/orders",
+                    params={'after_id': self.after_id, 'limit': 1000},
+                    timeout=5
+                )
+                rows = response.json() if response.status_code == 200 else []
+            except (requests.RequestException, ValueError):
+                rows = []
+            seen_at = time.perf_counter()
+            with self.lock:
+                for row in rows:
+                    accepted_at = self.accepted.pop(row['user_id'], None)
+                    if accepted_at is not None:
+                        self.latencies.append(seen_at - accepted_at)
+            if rows:
+                self.after_id = rows[-1]['id']
+                if len(rows) == 1000:
+                    continue
+            self.stopped.wait(self.interval)
+
+
+def worker(cluster, traffic, tracker, deadline, remaining, results, seed):
+    rng = random.Random(seed)
+    session = requests.Session()
+    latencies = {}
+    statuses = {}
+    while time.perf_counter() < deadline:
+        if remaining is not None:
+            with remaining['lock']:
+                if remaining['count'] <= 0:
+                    break
+                remaining['count'] -= 1
+
+        label, method, path, body, order_user_id = traffic.next_request(rng)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, cluster.gateway_url + path, json=body, timeout=30)
+            status = response.status_code
+        except requests.RequestException:
+            status = 'error'
+        finished = time.perf_counter()
+
+        latencies.setdefault(label, []).append(finished - start)
+        bucket = statuses.setdefault(label, {})
+        key = status if status == 'error' else f"{status // 100}xx"
+        bucket[key] = bucket.get(key, 0) + 1
+        if order_user_id is not None and status == 202:
+            tracker.accept(order_user_id, finished)
+    results.append((latencies, statuses))
+
+
+def run_load(cluster, args):
+    traffic = TrafficSource(args)
+    tracker = OrderTracker(cluster.billing_url, args.poll_interval)
+    tracker.thread.start()
+
+    # Warm up connection pools and caches before measuring
+    warm_deadline = time.perf_counter() + args.warmup
+    if args.warmup:
+        threads = [threading.Thread(target=worker, args=(cluster, traffic, tracker, warm_deadline, None, [], i))
+                   for i in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    with tracker.lock:
+        tracker.accepted.clear()
+        tracker.latencies.clear()
+
+    results = []
+    remaining = {'count': args.requests, 'lock': threading.Lock()} if args.requests else None
+    started = time.perf_counter()
+    deadline = started + (args.duration if not args.requests else 10 ** 9)
+    threads = [threading.Thread(target=worker, args=(cluster, traffic, tracker, deadline, remaining, results, 1000 + i))
+               for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Let the consumer catch up before reporting order-to-row latency
+    drain_deadline = time.monotonic() + args.drain_timeout
+    while tracker.pending() and time.monotonic() < drain_deadline:
+        time.sleep(0.05)
+    tracker.stopped.set()
+    tracker.thread.join()
+
+    latencies = {}
+    statuses = {}
+    for worker_latencies, worker_statuses in results:
+        for label, values in worker_latencies.items():
+            latencies.setdefault(label, []).extend(values)
+        for label, counts in worker_statuses.items():
+            merged = statuses.setdefault(label, {})
+            for key, count in counts.items():
+                merged[key] = merged.get(key, 0) + count
+
+    routes = {
+        label: dict(summarize(values, elapsed), statuses=statuses[label])
+        for label, values in sorted(latencies.items())
+    }
+    everything = [value for values in latencies.values() for value in values]
+    order_to_row = dict(summarize(tracker.latencies, elapsed), missing=tracker.pending())
+    del order_to_row['throughput_rps']
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'total': summarize(everything, elapsed),
+        'routes': routes,
+        'order_to_row': order_to_row,
+        'broker': cluster.broker_stats()
+    }
+
+
+def failed_routes(report):
+    """Routes that saw connection errors or 5xx responses"""
+    return [
+        label for label, stats in report['routes'].items()
+        if any(key in ('error', '5xx') for key in stats['statuses'])
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_ms(value):
+    return '-' if value is None else f"{value:.1f}"
+
+
+def print_report(report, baseline=None):
+    header = f"{'route':<28}{'count':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['routes'].items()) + [('TOTAL', report['total'])]
+    for label, stats in rows:
+        line = (f"{label:<28}{stats['count']:>8}{stats['throughput_rps']:>9}"
+                f"{format_ms(stats['p50_ms']):>9}{format_ms(stats['p95_ms']):>9}{format_ms(stats['p99_ms']):>9}")
+        if 'statuses' in stats:
+            line += '  ' + ' '.join(f"{key}={count}" for key, count in sorted(stats['statuses'].items(), key=str))
+        print(line)
+        previous = (baseline or {}).get('routes', {}).get(label) if label != 'TOTAL' else (baseline or {}).get('total')
+        if previous and previous.get('p95_ms') and stats['p95_ms'] and previous.get('throughput_rps'):
+            print(f"{'':<28}{'vs baseline:':>17}"
+                  f"{(stats['throughput_rps'] / previous['throughput_rps'] - 1) * 100:>+8.1f}% rps"
+                  f"{(stats['p95_ms'] / previous['p95_ms'] - 1) * 100:>+8.1f}% p95")
+
+    order = report['order_to_row']
+    print(f"\norder -> billing row: {order['count']} orders, p50 {format_ms(order['p50_ms'])} ms, "
+          f"p95 {format_ms(order['p95_ms'])} ms, p99 {format_ms(order['p99_ms'])} ms, "
+          f"{order['missing']} not stored before the drain timeout")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=16, help='parallel client threads')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of measured load')
+    parser.add_argument('--requests', type=int, help='stop after this many requests instead of --duration')
+    parser.add_argument('--warmup', type=float, default=2, help='unmeasured seconds before the run')
+    parser.add_argument('--movies', type=int, default=1000, help='movies seeded into a fresh inventory database')
+    parser.add_argument('--mix', help='route weights, e.g. get_movie=50,create_order=10')
+    parser.add_argument('--replay', help='JSON-lines file of requests to replay instead of the synthetic mix')
+    parser.add_argument('--engine', choices=('sync', 'async'), default='sync', help='gateway engine')
+    parser.add_argument('--inventory-db', help='SQLAlchemy URL (default: temporary SQLite)')
+    parser.add_argument('--billing-db', help='SQLAlchemy URL (default: temporary SQLite)')
+    parser.add_argument('--rabbitmq-host', help='use a real RabbitMQ instead of the in-memory fake')
+    parser.add_argument('--poll-interval', type=float, default=0.01, help='seconds between billing polls')
+    parser.add_argument('--drain-timeout', type=float, default=30, help='seconds to wait for queued orders')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='earlier --output file to compare against')
+    parser.add_argument('--keep-logs', action='store_true', help='keep service logs and databases')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with status 1 if any request failed or got a 5xx (smoke test)')
+    args = parser.parse_args()
+
+    with Cluster(args) as cluster:
+        report = run_load(cluster, args)
+
+    report = dict({
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'args': vars(args)
+        }
+    }, **report)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.check:
+        failed = failed_routes(report)
+        if failed:
+            print(f"\nCheck failed: {', '.join(failed)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Compare the ORM read path (objects + to_dict + jsonify) with the column-tuple encoder.
+
+Usage:
+    python benchmarks/serialization.py --service inventory --rows 20000 --repeat 5
+
+Runs against a throwaway SQLite database, checks that both paths produce the
+same bytes, and prints the best time of each.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+SERVICES = {
+    'inventory': ('inventory-app', 'Movie'),
+    'billing': ('billing-app', 'Order')
+}
+
+
+def seed_row(model_name, i):
+    if model_name == 'Movie':
+        return {
+            'title': f'Movie {i} édition',
+            'description': 'A benchmark movie' if i % 5 else None,
+            'price': 9.99 + i % 50,
+            'stock': i % 100,
+            'created_at': datetime(2024, 1, 1),
+            'updated_at': datetime(2024, 1, 2)
+        }
+    return {
+        'user_id': i % 1000,
+        'movie_id': i % 500,
+        'movie_title': f'Movie {i % 500}',
+        'quantity': 1 + i % 3,
+        'price': 19.99,
+        'total_amount': 19.99 * (1 + i % 3),
+        'status': 'processing',
+        'created_at': datetime(2024, 1, 1),
+        'updated_at': datetime(2024, 1, 2)
+    }
+
+
+def best_of(repeat, fn):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--service', choices=SERVICES, default='inventory')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app_dir, model_name = SERVICES[args.service]
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'srcs', app_dir))
+    warnings.filterwarnings('ignore', message='.*Decimal.*')
+
+    from flask import jsonify
+    from sqlalchemy import insert, select
+    from app.config import Config
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    Config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+
+    from app import create_app, db
+    from app import models
+    from app.serialization import encode_rows, model_encoder
+
+    model = getattr(models, model_name)
+    app = create_app()
+    try:
+        with app.app_context():
+            db.create_all()
+            db.session.execute(insert(model), [seed_row(model_name, i) for i in range(args.rows)])
+            db.session.commit()
+
+            def orm_path():
+                rows = db.session.scalars(select(model).order_by(model.id)).all()
+                body = jsonify([row.to_dict() for row in rows]).get_data()
+                db.session.expunge_all()
+                return body
+
+            def column_path():
+                columns, encode = model_encoder(model)
+                rows = db.session.execute(select(*columns).order_by(model.id)).all()
+                return encode_rows(rows, encode).encode()
+
+            orm_time, orm_body = best_of(args.repeat, orm_path)
+            fast_time, fast_body = best_of(args.repeat, column_path)
+    finally:
+        os.unlink(db_file)
+
+    if orm_body != fast_body:
+        print('MISMATCH: the two paths produced different output')
+        return 1
+
+    print(f"{args.service}: {args.rows} rows, best of {args.repeat}, output identical")
+    print(f"  ORM + to_dict + jsonify : {orm_time * 1000:9.1f} ms")
+    print(f"  column tuples + encoder : {fast_time * 1000:9.1f} ms  ({orm_time / fast_time:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
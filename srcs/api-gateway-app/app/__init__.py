@@ -1,14 +1,23 @@
-from flask import Flask
-
-def create_app():
-    app = Flask(__name__)
-    
-    # Load configuration
-    from app.config import Config
-    app.config.from_object(Config)
-    
-    # Register routes
-    from app.proxy import gateway_bp
-    app.register_blueprint(gateway_bp)
-    
+from flask import Flask
+
+def create_app():
+    app = Flask(__name__)
+    
+    # Load configuration
+    from app.config import Config
+    app.config.from_object(Config)
+    
+    # Register routes
+    from app.proxy import gateway_bp
+    app.register_blueprint(gateway_bp)
+    
+    # Prometheus metrics at /metrics
+    from app.metrics import init_metrics
+    init_metrics(app)
+    
+    # Create the order publisher up front so its spool check runs before the first order
+    from app.publisher import get_publisher
+    with app.app_context():
+        get_publisher()
+    
     return app
\ No newline at end of file
@@ -0,0 +1,168 @@
+import atexit
+import contextvars
+import fcntl
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_writer_lock = threading.Lock()
+
+# Upstream time spent by the current request, shared by both gateway engines
+_upstream_time = contextvars.ContextVar('upstream_time', default=None)
+
+
+def start_upstream_timer():
+    _upstream_time.set([0.0])
+
+
+def record_upstream_time(seconds):
+    timer = _upstream_time.get()
+    if timer is not None:
+        timer[0] += seconds
+
+
+def upstream_time_ms():
+    timer = _upstream_time.get()
+    return round(timer[0] * 1000, 3) if timer is not None else None
+
+
+class AccessLogWriter:
+    """Background access log writer fed by a bounded in-memory queue"""
+
+    def __init__(self, path, queue_size, batch_size, flush_interval,
+                 max_bytes, backup_count, full_policy):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.block_when_full = full_policy == 'block'
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._fd = None
+        self._thread = threading.Thread(target=self._run, name='access-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry):
+        """Queue one entry; drops it (or blocks, per policy) when the queue is full"""
+        if self.block_when_full:
+            self._queue.put(entry)
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Flush everything queued so far and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = False
+
+            if entry is None:
+                self._flush(batch)
+                return
+            if entry is not False:
+                batch.append(entry)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        data = ''.join(json.dumps(entry) + '\n' for entry in batch).encode()
+        try:
+            # Follow a rotation done by another worker, so we neither keep appending to
+            # gateway.log.1 nor grow it past max_bytes
+            if self._fd is not None and self._rotated_away():
+                self._close_fd()
+            if self._fd is None:
+                self._open()
+            if self.max_bytes and os.fstat(self._fd).st_size + len(data) > self.max_bytes:
+                self._rotate()
+            # One O_APPEND write per batch keeps lines from different workers whole
+            os.write(self._fd, data)
+        except OSError as e:
+            logger.error(f"Error writing access log: {str(e)}")
+            self._close_fd()
+
+    def _open(self):
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _close_fd(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def _rotated_away(self):
+        """Whether self.path no longer names the file our fd writes to"""
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._fd).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _rotate(self):
+        """Rotate gateway.log -> gateway.log.1 -> ... under a lock shared by all workers"""
+        with open(f"{self.path}.lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            # Another worker may have rotated already; then just reopen
+            if not self._rotated_away():
+                for i in range(self.backup_count - 1, 0, -1):
+                    source = f"{self.path}.{i}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.path}.{i + 1}")
+                if self.backup_count > 0:
+                    os.replace(self.path, f"{self.path}.1")
+                else:
+                    os.truncate(self.path, 0)
+
+            self._close_fd()
+            self._open()
+
+
+def build_access_log(config):
+    return AccessLogWriter(
+        path=config['LOG_FILE'],
+        queue_size=int(config['LOG_QUEUE_SIZE']),
+        batch_size=int(config['LOG_BATCH_SIZE']),
+        flush_interval=float(config['LOG_FLUSH_INTERVAL']),
+        max_bytes=int(config['LOG_MAX_BYTES']),
+        backup_count=int(config['LOG_BACKUP_COUNT']),
+        full_policy=config['LOG_FULL_POLICY']
+    )
+
+
+def get_access_log():
+    """Return this worker's access log writer, starting it on first use"""
+    writer = current_app.extensions.get('access_log')
+    if writer is None:
+        with _writer_lock:
+            writer = current_app.extensions.get('access_log')
+            if writer is None:
+                writer = build_access_log(current_app.config)
+                current_app.extensions['access_log'] = writer
+    return writer
@@ -0,0 +1,692 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import aiohttp
+import aio_pika
+from aiohttp import web
+
+from app.access_log import build_access_log, record_upstream_time, start_upstream_timer, upstream_time_ms
+from app.cache import CACHE_STATUS, CachedResponse, build_cache, etag_matches
+from app.config import Config
+from app.metrics import (
+    CONTENT_TYPE_LATEST, REQUEST_LATENCY, REQUESTS_IN_FLIGHT, STOCK_HINT_REJECTIONS, observe_publish,
+    observe_upstream, render_metrics, route_label
+)
+from app.proxy import (
+    CACHED_HEADERS, CONDITIONAL_HEADERS, PASSTHROUGH_HEADERS, REQUIRED_ORDER_FIELDS, VALIDATOR_HEADERS,
+    build_order_data
+)
+from app.publisher import adopt_stale_spools, claim_spool, release_spool, spool_messages
+from app.singleflight import AsyncSingleFlight
+from app.stock_hints import build_stock_hints
+from app.upstream import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+request_start = contextvars.ContextVar('request_start')
+
+
+def json_response(data, status=200):
+    """Serialize like Flask's jsonify so both engines return identical bodies"""
+    body = json.dumps(data, sort_keys=True, separators=(',', ':')) + '\n'
+    return web.Response(text=body, status=status, content_type='application/json')
+
+
+class AsyncUpstreamClient:
+    """aiohttp client for one upstream service, guarded by a circuit breaker"""
+
+    def __init__(self, name, base_url, pool_size, connect_timeout, read_timeout,
+                 failure_threshold, reset_timeout):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.session = None
+
+    async def start(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+            timeout=self.timeout,
+            auto_decompress=False
+        )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def request(self, method, path, **kwargs):
+        """Send a request and return the unread response; the caller must release it"""
+        admitted = self.breaker.allow()
+        if not admitted:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        started = time.perf_counter()
+        status_code = None
+        try:
+            response = await self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            status_code = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Any other error, cancellation included, must not leave the breaker half-open forever
+            if admitted == CircuitBreaker.PROBE:
+                self.breaker.abandon_probe()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            record_upstream_time(elapsed)
+            observe_upstream(self.name, method, status_code, elapsed)
+
+        if response.status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+
+class AsyncOrderPublisher:
+    """aio-pika publisher with asynchronous confirms, sharing the sync spool format"""
+
+    def __init__(self, config):
+        self.config = config
+        self.queue = config['RABBITMQ_QUEUE']
+        self.spool_file = config['RABBITMQ_SPOOL_FILE']
+        self.connect_timeout = float(config['RABBITMQ_CONNECT_TIMEOUT'])
+        self.retry_interval = float(config['RABBITMQ_RETRY_INTERVAL'])
+        self.check_interval = float(config['RABBITMQ_SPOOL_CHECK_INTERVAL'])
+        self.connection = None
+        self.channel = None
+        self._connect_lock = asyncio.Lock()
+        self._drain_task = None
+        self._watch_task = None
+        self._retry_after = 0.0
+
+        adopt_stale_spools(self.spool_file)
+
+    def start(self):
+        if self.check_interval > 0:
+            self._watch_task = asyncio.create_task(self._watch_spool())
+
+    async def _ensure_channel(self):
+        if self.channel is not None and not self.channel.is_closed:
+            return self.channel
+
+        async with self._connect_lock:
+            if self.channel is not None and not self.channel.is_closed:
+                return self.channel
+
+            if self.connection is None or self.connection.is_closed:
+                # connect_robust reconnects transparently after broker restarts
+                self.connection = await aio_pika.connect_robust(
+                    host=self.config['RABBITMQ_HOST'],
+                    port=int(self.config['RABBITMQ_PORT']),
+                    login=self.config['RABBITMQ_USER'],
+                    password=self.config['RABBITMQ_PASSWORD'],
+                    heartbeat=int(self.config['RABBITMQ_HEARTBEAT']),
+                    timeout=self.connect_timeout
+                )
+            self.channel = await self.connection.channel(publisher_confirms=True)
+            await self.channel.declare_queue(self.queue, durable=True)
+            return self.channel
+
+    async def _publish(self, body):
+        if time.monotonic() < self._retry_after:
+            raise ConnectionError('Broker marked unavailable')
+
+        try:
+            channel = await self._ensure_channel()
+            # Confirms are awaited per message but many publishes can be in flight at once
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=body.encode(),
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    content_type='application/json'
+                ),
+                routing_key=self.queue,
+                timeout=self.connect_timeout
+            )
+        except Exception:
+            self._retry_after = time.monotonic() + self.retry_interval
+            raise
+
+    async def publish(self, data):
+        """Publish an order, spooling it to disk if the broker is unreachable"""
+        body = json.dumps(data)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        try:
+            await self._publish(body)
+        except Exception as e:
+            logger.warning(f"Broker unavailable, spooling message: {str(e)}")
+            try:
+                await loop.run_in_executor(None, spool_messages, self.spool_file, [body])
+                observe_publish('spooled', started)
+                return True
+            except OSError as e:
+                logger.error(f"Error spooling message: {str(e)}")
+                observe_publish('failed', started)
+                return False
+
+        observe_publish('confirmed', started)
+        self._maybe_drain()
+        return True
+
+    def _maybe_drain(self):
+        """Kick off a background drain if earlier messages were spooled"""
+        if os.path.exists(self.spool_file) and (self._drain_task is None or self._drain_task.done()):
+            self._drain_task = asyncio.create_task(self.drain_spool())
+
+    async def _watch_spool(self):
+        """Retry spooled messages periodically, so they do not wait for the next confirmed order"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if time.monotonic() >= self._retry_after:
+                self._maybe_drain()
+
+    async def drain_spool(self):
+        """Republish spooled messages now that the broker is reachable again"""
+        loop = asyncio.get_running_loop()
+        draining, pending = await loop.run_in_executor(None, claim_spool, self.spool_file)
+        if draining is None:
+            return
+
+        sent = 0
+        try:
+            for body in pending:
+                await self._publish(body)
+                sent += 1
+        except Exception as e:
+            logger.warning(f"Spool drain interrupted after {sent} messages: {str(e)}")
+
+        try:
+            await loop.run_in_executor(None, release_spool, self.spool_file, draining, pending[sent:])
+        except OSError as e:
+            logger.error(f"Error releasing {draining}, left for recovery: {str(e)}")
+        logger.info(f"Republished {sent} spooled messages")
+
+    async def close(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        if self.connection is not None:
+            await self.connection.close()
+
+
+def log_request(app, endpoint, method, status_code):
+    """Queue a request log entry for the background log writer"""
+    try:
+        log_entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'endpoint': endpoint,
+            'method': method,
+            'status_code': status_code,
+            'latency_ms': round((time.perf_counter() - request_start.get()) * 1000, 3),
+            'upstream_ms': upstream_time_ms()
+        }
+
+        app['access_log'].write(log_entry)
+    except Exception as e:
+        logger.error(f"Error logging request: {str(e)}")
+
+
+@web.middleware
+async def track_metrics(request, handler):
+    """Per-route latency histogram and in-flight gauge, with the same route labels as the Flask engine"""
+    resource = request.match_info.route.resource
+    # canonical drops the {movie_id:\d+} patterns, leaving /api/movies/{movie_id}
+    route = route_label(resource.canonical) if resource is not None else 'unmatched'
+    in_flight = REQUESTS_IN_FLIGHT.labels(route)
+    in_flight.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        in_flight.dec()
+        REQUEST_LATENCY.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+
+
+@web.middleware
+async def request_timer(request, handler):
+    """Start the per-request latency clocks used by log_request"""
+    request_start.set(time.perf_counter())
+    start_upstream_timer()
+    return await handler(request)
+
+
+async def relay(request, response):
+    """Stream an upstream response to the client without decoding it"""
+    try:
+        if response.status == 304 or request.app['config']['PROXY_PASSTHROUGH'] != 'true':
+            validators = {
+                name: response.headers[name]
+                for name in VALIDATOR_HEADERS if name in response.headers
+            }
+            if response.status == 304:
+                return web.Response(status=304, headers=validators)
+            relayed = json_response(await response.json(), response.status)
+            relayed.headers.update(validators)
+            return relayed
+
+        headers = {
+            name: response.headers[name]
+            for name in PASSTHROUGH_HEADERS if name in response.headers
+        }
+        stream = web.StreamResponse(status=response.status, headers=headers)
+        await stream.prepare(request)
+        try:
+            async for chunk in response.content.iter_chunked(request.app['chunk_size']):
+                await stream.write(chunk)
+            await stream.write_eof()
+        except Exception as e:
+            # Status and headers are already out, so no error response can follow; cut the
+            # connection so the client sees a truncated body instead of a complete-looking one
+            logger.error(f"Upstream stream failed mid-response: {str(e)}")
+            if request.transport is not None:
+                request.transport.close()
+        return stream
+    finally:
+        response.release()
+
+
+def with_query(request, path):
+    """Append the client's query string (pagination/streaming args) to an upstream path"""
+    query = request.query_string
+    return f"{path}?{query}" if query else path
+
+
+def conditional_headers(request):
+    """The client's validators, forwarded on uncached reads so upstream can answer 304"""
+    return {name: request.headers[name] for name in CONDITIONAL_HEADERS if name in request.headers}
+
+
+async def fetch_cacheable(upstream, path, etag=None):
+    """Fetch an upstream GET fully into a cache entry; with etag, an unchanged resource comes back as a 304"""
+    response = await upstream.request('GET', path, headers={'If-None-Match': etag} if etag else None)
+    async with response:
+        headers = {
+            name: response.headers[name]
+            for name in CACHED_HEADERS if name in response.headers
+        }
+        return CachedResponse(response.status, headers, await response.read())
+
+
+async def fetch_entry(request, upstream, path, coalesce, etag=None):
+    """Fetch a cache entry; with coalesce, concurrent identical requests share one upstream call"""
+    if not coalesce:
+        return await fetch_cacheable(upstream, path, etag)
+    # Revalidations only coalesce with each other; a 304 is no answer to a plain fetch
+    return await request.app['single_flight'].do(
+        f"{upstream.name}:{path}" + (f" {etag}" if etag else ''),
+        lambda: fetch_cacheable(upstream, path, etag),
+        timeout=float(request.app['config']['COALESCE_TIMEOUT'])
+    )
+
+
+async def refresh_entry(cache, upstream, path, key, stale):
+    """Revalidate or re-fetch a stale cache entry in the background"""
+    try:
+        entry = await fetch_cacheable(upstream, path, stale.headers.get('ETag'))
+        if entry.status == 304:
+            cache.touch(key, stale)
+        elif entry.status == 200:
+            cache.store(key, entry)
+    except Exception as e:
+        logger.warning(f"Error refreshing cached {path}: {str(e)}")
+    finally:
+        cache.end_refresh(key)
+
+
+async def cached_get(request, upstream, path, key, coalesce=False):
+    """Serve an upstream GET from the response cache, revalidating stale entries in the background"""
+    cache = request.app['cache']
+    entry, state = cache.lookup(key)
+
+    if state == 'stale' and cache.begin_refresh(key):
+        # The loop only keeps weak references to tasks, so hold on to the refresh until it is done
+        task = asyncio.create_task(refresh_entry(cache, upstream, path, key, entry))
+        request.app['refresh_tasks'].add(task)
+        task.add_done_callback(request.app['refresh_tasks'].discard)
+
+    if state == 'expired':
+        # Ask upstream whether our copy is still current; a 304 skips its serialization and the transfer
+        fetched = await fetch_entry(request, upstream, path, coalesce, entry.headers['ETag'])
+        if fetched.status == 304:
+            cache.touch(key, entry)
+            state = 'revalidated'
+        else:
+            entry, state = fetched, 'miss'
+            if entry.status == 200:
+                cache.store(key, entry)
+            else:
+                cache.invalidate(key)
+
+    if entry is None:
+        entry = await fetch_entry(request, upstream, path, coalesce)
+        if entry.status == 200:
+            cache.store(key, entry)
+        state = 'miss'
+
+    return entry_response(request, entry, state)
+
+
+def entry_response(request, entry, state=None):
+    """Answer from a fetched or cached entry, or 304 when the client's If-None-Match matches it"""
+    headers = dict(entry.headers)
+    if state is not None:
+        headers['X-Cache'] = CACHE_STATUS[state]
+    if entry.status == 200 and etag_matches(request.headers.get('If-None-Match'), entry.headers.get('ETag')):
+        headers.pop('Content-Type', None)
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=entry.body, status=entry.status, headers=headers)
+
+
+def invalidate_movies(app, movie_id=None):
+    """Drop cached catalog entries after the gateway changed inventory"""
+    if app['config']['CACHE_ENABLED'] != 'true':
+        return
+    app['cache'].invalidate_prefix('movies:list')
+    app['cache'].invalidate_prefix('movies:search')
+    if movie_id is not None:
+        app['cache'].invalidate(f'movies:{movie_id}')
+
+
+async def proxy_get(request, service, path, endpoint, error_message, cache_key=None, coalesce=False):
+    """Relay a GET to an upstream, mapping failures like the sync engine does"""
+    upstream = request.app['upstreams'][service]
+    coalesce = coalesce and request.app['config']['COALESCE_ENABLED'] == 'true'
+    try:
+        if cache_key is not None and request.app['config']['CACHE_ENABLED'] == 'true':
+            response = await cached_get(request, upstream, path, cache_key, coalesce)
+            log_request(request.app, endpoint, 'GET', response.status)
+            return response
+
+        if coalesce:
+            entry = await fetch_entry(request, upstream, path, coalesce)
+            log_request(request.app, endpoint, 'GET', entry.status)
+            return entry_response(request, entry)
+
+        response = await upstream.request('GET', path, headers=conditional_headers(request))
+        log_request(request.app, endpoint, 'GET', response.status)
+        return await relay(request, response)
+    except CircuitOpenError:
+        log_request(request.app, endpoint, 'GET', 503)
+        return json_response({'error': f'{service.capitalize()} service unavailable'}, 503)
+    except Exception as e:
+        logger.error(f"{error_message}: {str(e)}")
+        log_request(request.app, endpoint, 'GET', 500)
+        return json_response({'error': error_message}, 500)
+
+
+# ==================== ROUTES ====================
+routes = web.RouteTableDef()
+
+
+@routes.get('/')
+async def home(request):
+    return json_response({
+        "message": "Welcome to Play with Containers API Gateway 🚀",
+        "status": "running",
+        "endpoints": ["/health", "/inventory", "/billing"]
+    })
+
+
+@routes.get('/health')
+async def health_check(request):
+    """Health check endpoint"""
+    return json_response({'status': 'healthy', 'service': 'api-gateway'})
+
+
+@routes.get('/metrics')
+async def metrics(request):
+    """Prometheus metrics for this process (merged across processes in multiprocess mode)"""
+    loop = asyncio.get_running_loop()
+    body = await loop.run_in_executor(None, render_metrics)
+    return web.Response(body=body, headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+
+@routes.get('/cache/stats')
+async def cache_stats(request):
+    """Response cache and request coalescing counters for this worker"""
+    return json_response(dict(request.app['cache'].stats(),
+                              single_flight=request.app['single_flight'].stats(),
+                              stock_hints=request.app['stock_hints'].stats()))
+
+
+@routes.get('/api/movies')
+async def get_movies(request):
+    """Get all movies from inventory service"""
+    path = with_query(request, '/api/movies')
+    # Streamed listings go straight through; they are too large to buffer and cache
+    cache_key = None if 'stream' in request.query else f"movies:list{path[len('/api/movies'):]}"
+    return await proxy_get(request, 'inventory', path, '/api/movies',
+                           'Failed to fetch movies', cache_key=cache_key,
+                           coalesce=cache_key is not None)
+
+
+@routes.get('/api/movies/search')
+async def search_movies(request):
+    """Search the catalog through inventory service"""
+    path = with_query(request, '/api/movies/search')
+    return await proxy_get(request, 'inventory', path, '/api/movies/search',
+                           'Failed to search movies',
+                           cache_key=f"movies:search{path[len('/api/movies/search'):]}",
+                           coalesce=True)
+
+
+@routes.get(r'/api/movies/{movie_id:\d+}')
+async def get_movie(request):
+    """Get a specific movie from inventory service"""
+    movie_id = int(request.match_info['movie_id'])
+    return await proxy_get(request, 'inventory', f'/api/movies/{movie_id}',
+                           f'/api/movies/{movie_id}', 'Failed to fetch movie',
+                           cache_key=f'movies:{movie_id}', coalesce=True)
+
+
+@routes.post('/api/movies')
+async def create_movie(request):
+    """Create a new movie in inventory service"""
+    upstream = request.app['upstreams']['inventory']
+    try:
+        response = await upstream.request('POST', '/api/movies', json=await request.json())
+        log_request(request.app, '/api/movies', 'POST', response.status)
+        if response.status == 201:
+            invalidate_movies(request.app)
+        return await relay(request, response)
+    except CircuitOpenError:
+        log_request(request.app, '/api/movies', 'POST', 503)
+        return json_response({'error': 'Inventory service unavailable'}, 503)
+    except Exception as e:
+        logger.error(f"Error creating movie: {str(e)}")
+        log_request(request.app, '/api/movies', 'POST', 500)
+        return json_response({'error': 'Failed to create movie'}, 500)
+
+
+@routes.post('/api/movies/bulk')
+async def bulk_import_movies(request):
+    """Stream a bulk catalog import (NDJSON or CSV) to inventory service without buffering it"""
+    upstream = request.app['upstreams']['inventory']
+    config = request.app['config']
+    try:
+        response = await upstream.request(
+            'POST', '/api/movies/bulk',
+            data=request.content,
+            headers={'Content-Type': request.headers.get('Content-Type', '')},
+            timeout=aiohttp.ClientTimeout(sock_connect=float(config['UPSTREAM_CONNECT_TIMEOUT']),
+                                          sock_read=float(config['BULK_IMPORT_TIMEOUT']))
+        )
+        log_request(request.app, '/api/movies/bulk', 'POST', response.status)
+        if response.status == 200:
+            invalidate_movies(request.app)
+            # Imports set stock outside a reduce-stock reply, so every hint may be stale now
+            if config['STOCK_HINTS_ENABLED'] == 'true':
+                request.app['stock_hints'].forget()
+        return await relay(request, response)
+    except CircuitOpenError:
+        log_request(request.app, '/api/movies/bulk', 'POST', 503)
+        return json_response({'error': 'Inventory service unavailable'}, 503)
+    except Exception as e:
+        logger.error(f"Error importing movies: {str(e)}")
+        log_request(request.app, '/api/movies/bulk', 'POST', 500)
+        return json_response({'error': 'Failed to import movies'}, 500)
+
+
+@routes.get('/api/orders')
+async def get_orders(request):
+    """Get all orders from billing service"""
+    return await proxy_get(request, 'billing', with_query(request, '/api/orders'), '/api/orders',
+                           'Failed to fetch orders')
+
+
+@routes.get(r'/api/orders/{order_id:\d+}')
+async def get_order(request):
+    """Get a specific order from billing service"""
+    order_id = int(request.match_info['order_id'])
+    return await proxy_get(request, 'billing', f'/api/orders/{order_id}',
+                           f'/api/orders/{order_id}', 'Failed to fetch order')
+
+
+@routes.get(r'/api/orders/user/{user_id:\d+}')
+async def get_user_orders(request):
+    """Get all orders for a specific user"""
+    user_id = int(request.match_info['user_id'])
+    return await proxy_get(request, 'billing', with_query(request, f'/api/orders/user/{user_id}'),
+                           f'/api/orders/user/{user_id}', 'Failed to fetch user orders')
+
+
+@routes.get(r'/api/stats/movies/{movie_id:\d+}')
+async def get_movie_stats(request):
+    """Get sales totals for a movie from billing service"""
+    movie_id = int(request.match_info['movie_id'])
+    return await proxy_get(request, 'billing', f'/api/stats/movies/{movie_id}',
+                           f'/api/stats/movies/{movie_id}', 'Failed to fetch movie stats')
+
+
+@routes.get('/api/stats/daily')
+async def get_daily_stats(request):
+    """Get per-day sales totals from billing service"""
+    return await proxy_get(request, 'billing', with_query(request, '/api/stats/daily'),
+                           '/api/stats/daily', 'Failed to fetch daily stats')
+
+
+@routes.post('/api/orders')
+async def create_order(request):
+    """Create a new order and send to RabbitMQ queue"""
+    inventory = request.app['upstreams']['inventory']
+    try:
+        data = await request.json()
+
+        # Validate required fields
+        if not all(field in data for field in REQUIRED_ORDER_FIELDS):
+            return json_response({'error': 'Missing required fields'}, 400)
+
+        # Turn away orders a fresh stock hint already shows cannot be met
+        hints = request.app['stock_hints'] if request.app['config']['STOCK_HINTS_ENABLED'] == 'true' else None
+        if hints is not None and hints.available(data['movie_id'], data['quantity']) is not None:
+            STOCK_HINT_REJECTIONS.inc()
+            return json_response({'error': 'Insufficient stock'}, 400)
+
+        # Reserve stock atomically; inventory returns the movie details we need
+        stock_response = await inventory.request(
+            'POST',
+            f"/api/movies/{data['movie_id']}/reduce-stock",
+            json={'quantity': data['quantity']}
+        )
+        async with stock_response:
+            if stock_response.status == 404:
+                return json_response({'error': 'Movie not found'}, 404)
+            if stock_response.status == 400:
+                body = await stock_response.json()
+                if hints is not None and 'available' in body:
+                    hints.observe(body.get('movie_id'), body['available'])
+                return json_response({'error': body.get('error', 'Insufficient stock')}, 400)
+            if stock_response.status != 200:
+                return json_response({'error': 'Failed to reduce stock'}, 500)
+            movie = await stock_response.json()
+        if hints is not None:
+            hints.observe(movie.get('id'), movie.get('stock'))
+
+        invalidate_movies(request.app, data['movie_id'])
+
+        # Prepare order data
+        order_data = build_order_data(data, movie)
+
+        # Send to RabbitMQ queue
+        if await request.app['publisher'].publish(order_data):
+            logger.info(f"Message sent to queue: {order_data}")
+            log_request(request.app, '/api/orders', 'POST', 202)
+            return json_response({
+                'message': 'Order received and queued for processing',
+                'order_data': order_data
+            }, 202)
+        else:
+            log_request(request.app, '/api/orders', 'POST', 500)
+            return json_response({'error': 'Failed to queue order'}, 500)
+
+    except CircuitOpenError:
+        log_request(request.app, '/api/orders', 'POST', 503)
+        return json_response({'error': 'Inventory service unavailable'}, 503)
+    except Exception as e:
+        logger.error(f"Error creating order: {str(e)}")
+        log_request(request.app, '/api/orders', 'POST', 500)
+        return json_response({'error': 'Failed to create order'}, 500)
+
+
+# ==================== APP FACTORY ====================
+async def _startup(app):
+    for upstream in app['upstreams'].values():
+        await upstream.start()
+    app['publisher'].start()
+
+
+async def _cleanup(app):
+    for upstream in app['upstreams'].values():
+        await upstream.close()
+    await app['publisher'].close()
+
+
+def create_async_app():
+    """Build the asyncio gateway serving the same routes as gateway_bp"""
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+
+    connect_timeout = float(config['UPSTREAM_CONNECT_TIMEOUT'])
+    read_timeout = float(config['UPSTREAM_READ_TIMEOUT'])
+    failure_threshold = int(config['CIRCUIT_FAILURE_THRESHOLD'])
+    reset_timeout = float(config['CIRCUIT_RESET_TIMEOUT'])
+
+    app = web.Application(middlewares=[track_metrics, request_timer])
+    app['config'] = config
+    app['chunk_size'] = int(config['PROXY_CHUNK_SIZE'])
+    app['upstreams'] = {
+        'inventory': AsyncUpstreamClient(
+            'inventory', config['INVENTORY_SERVICE_URL'], int(config['INVENTORY_POOL_SIZE']),
+            connect_timeout, read_timeout, failure_threshold, reset_timeout
+        ),
+        'billing': AsyncUpstreamClient(
+            'billing', config['BILLING_SERVICE_URL'], int(config['BILLING_POOL_SIZE']),
+            connect_timeout, read_timeout, failure_threshold, reset_timeout
+        ),
+    }
+    app['publisher'] = AsyncOrderPublisher(config)
+    app['cache'] = build_cache(config)
+    app['single_flight'] = AsyncSingleFlight()
+    app['stock_hints'] = build_stock_hints(config)
+    app['refresh_tasks'] = set()
+    app['access_log'] = build_access_log(config)
+
+    app.add_routes(routes)
+    app.on_startup.append(_startup)
+    app.on_cleanup.append(_cleanup)
+    return app
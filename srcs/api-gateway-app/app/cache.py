@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+_cache_lock = threading.Lock()
+
+# X-Cache header value for each lookup outcome
+CACHE_STATUS = {'fresh': 'HIT', 'stale': 'STALE', 'miss': 'MISS', 'revalidated': 'REVALIDATED'}
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header value against an ETag"""
+    if not if_none_match or not etag:
+        return False
+    opaque = etag.removeprefix('W/')
+    return any(
+        tag == '*' or tag.removeprefix('W/') == opaque
+        for tag in (value.strip() for value in if_none_match.split(','))
+    )
+
+
+class CachedResponse:
+    """Upstream response body and headers kept by the gateway cache"""
+
+    __slots__ = ('status', 'headers', 'body', 'stored_at')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a TTL and a stale-while-revalidate window"""
+
+    def __init__(self, max_entries, max_bytes, ttl, stale_ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+
+    def lookup(self, key):
+        """Return (entry, state) where state is 'fresh', 'stale', 'expired' or None on a miss.
+
+        Entries past the stale window are kept while they carry an ETag, so the caller
+        can revalidate them upstream with If-None-Match instead of fetching the body again.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry.stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry, 'fresh'
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return entry, 'stale'
+                if 'ETag' in entry.headers:
+                    self.misses += 1
+                    return entry, 'expired'
+                self._remove(key)
+            self.misses += 1
+            return None, None
+
+    def store(self, key, entry):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def touch(self, key, entry):
+        """Restart the TTL of an entry upstream confirmed unchanged, unless it was replaced meanwhile"""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                entry.stored_at = time.monotonic()
+                self._entries.move_to_end(key)
+                self.revalidations += 1
+
+    def begin_refresh(self, key):
+        """Claim the background refresh for a stale key; False if one is already running"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+
+    def invalidate_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'revalidations': self.revalidations
+            }
+
+
+def build_cache(config):
+    return ResponseCache(
+        max_entries=int(config['CACHE_MAX_ENTRIES']),
+        max_bytes=int(config['CACHE_MAX_BYTES']),
+        ttl=float(config['CACHE_TTL']),
+        stale_ttl=float(config['CACHE_STALE_TTL'])
+    )
+
+
+def get_cache():
+    """Return this worker's response cache, creating it on first use"""
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = current_app.extensions.get('response_cache')
+            if cache is None:
+                cache = build_cache(current_app.config)
+                current_app.extensions['response_cache'] = cache
+    return cache
@@ -1,16 +1,64 @@
-import os
-
-class Config:
-    # Service URLs
-    INVENTORY_SERVICE_URL = os.getenv('INVENTORY_SERVICE_URL', 'http://inventory-app:8080')
-    BILLING_SERVICE_URL = os.getenv('BILLING_SERVICE_URL', 'http://billing-app:8080')
-    
-    # RabbitMQ Configuration
-    RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'rabbit-queue')
-    RABBITMQ_PORT = os.getenv('RABBITMQ_PORT', '5672')
-    RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'admin')
-    RABBITMQ_PASSWORD = os.getenv('RABBITMQ_PASSWORD', 'admin')
-    RABBITMQ_QUEUE = os.getenv('RABBITMQ_QUEUE', 'payment_queue')
-    
-    # Logging
-    LOG_FILE = '/var/log/gateway/gateway.log'
\ No newline at end of file
+import os
+
+class Config:
+    # Service URLs
+    INVENTORY_SERVICE_URL = os.getenv('INVENTORY_SERVICE_URL', 'http://inventory-app:8080')
+    BILLING_SERVICE_URL = os.getenv('BILLING_SERVICE_URL', 'http://billing-app:8080')
+    
+    # Upstream HTTP clients (keep-alive pools per worker) and circuit breaker
+    INVENTORY_POOL_SIZE = os.getenv('INVENTORY_POOL_SIZE', '20')
+    BILLING_POOL_SIZE = os.getenv('BILLING_POOL_SIZE', '20')
+    UPSTREAM_CONNECT_TIMEOUT = os.getenv('UPSTREAM_CONNECT_TIMEOUT', '1')
+    UPSTREAM_READ_TIMEOUT = os.getenv('UPSTREAM_READ_TIMEOUT', '5')
+    CIRCUIT_FAILURE_THRESHOLD = os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5')
+    CIRCUIT_RESET_TIMEOUT = os.getenv('CIRCUIT_RESET_TIMEOUT', '10')
+    # Read timeout for POST /api/movies/bulk, which answers only once the whole import is stored
+    BULK_IMPORT_TIMEOUT = os.getenv('BULK_IMPORT_TIMEOUT', '900')
+    
+    # Stream upstream bodies to clients as-is instead of decoding/re-encoding JSON
+    PROXY_PASSTHROUGH = os.getenv('PROXY_PASSTHROUGH', 'true').lower()
+    PROXY_CHUNK_SIZE = os.getenv('PROXY_CHUNK_SIZE', '65536')
+    
+    # Catalog response cache (per worker), in seconds / entries / bytes
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower()
+    CACHE_TTL = os.getenv('CACHE_TTL', '5')
+    CACHE_STALE_TTL = os.getenv('CACHE_STALE_TTL', '30')
+    CACHE_MAX_ENTRIES = os.getenv('CACHE_MAX_ENTRIES', '1024')
+    CACHE_MAX_BYTES = os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024))
+    
+    # Coalesce concurrent identical upstream GETs on catalog routes into one call;
+    # waiters block at most COALESCE_TIMEOUT seconds before calling upstream themselves
+    COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', 'true').lower()
+    COALESCE_TIMEOUT = os.getenv('COALESCE_TIMEOUT', '2')
+    
+    # Short-lived per-movie stock hints fed by inventory's reduce-stock replies; a fresh
+    # hint below the requested quantity rejects the order without an inventory call
+    STOCK_HINTS_ENABLED = os.getenv('STOCK_HINTS_ENABLED', 'true').lower()
+    STOCK_HINT_TTL = os.getenv('STOCK_HINT_TTL', '1')
+    STOCK_HINT_MAX_ENTRIES = os.getenv('STOCK_HINT_MAX_ENTRIES', '10000')
+    
+    # RabbitMQ Configuration
+    RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'rabbit-queue')
+    RABBITMQ_PORT = os.getenv('RABBITMQ_PORT', '5672')
+    RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'admin')
+    RABBITMQ_PASSWORD = os.getenv('RABBITMQ_PASSWORD', 'admin')
+    RABBITMQ_QUEUE = os.getenv('RABBITMQ_QUEUE', 'payment_queue')
+    RABBITMQ_HEARTBEAT = os.getenv('RABBITMQ_HEARTBEAT', '60')
+    RABBITMQ_BLOCKED_TIMEOUT = os.getenv('RABBITMQ_BLOCKED_TIMEOUT', '30')
+    
+    # Publisher pool (per worker) and local spool used while the broker is down
+    RABBITMQ_POOL_SIZE = os.getenv('RABBITMQ_POOL_SIZE', '4')
+    RABBITMQ_POOL_TIMEOUT = os.getenv('RABBITMQ_POOL_TIMEOUT', '2')
+    RABBITMQ_CONNECT_TIMEOUT = os.getenv('RABBITMQ_CONNECT_TIMEOUT', '2')
+    RABBITMQ_RETRY_INTERVAL = os.getenv('RABBITMQ_RETRY_INTERVAL', '5')
+    RABBITMQ_SPOOL_FILE = os.getenv('RABBITMQ_SPOOL_FILE', '/var/log/gateway/order_spool.jsonl')
+    RABBITMQ_SPOOL_CHECK_INTERVAL = os.getenv('RABBITMQ_SPOOL_CHECK_INTERVAL', '30')
+    
+    # Logging (buffered background writer with size-based rotation)
+    LOG_FILE = os.getenv('LOG_FILE', '/var/log/gateway/gateway.log')
+    LOG_QUEUE_SIZE = os.getenv('LOG_QUEUE_SIZE', '10000')
+    LOG_BATCH_SIZE = os.getenv('LOG_BATCH_SIZE', '256')
+    LOG_FLUSH_INTERVAL = os.getenv('LOG_FLUSH_INTERVAL', '1')
+    LOG_MAX_BYTES = os.getenv('LOG_MAX_BYTES', str(100 * 1024 * 1024))
+    LOG_BACKUP_COUNT = os.getenv('LOG_BACKUP_COUNT', '5')
+    LOG_FULL_POLICY = os.getenv('LOG_FULL_POLICY', 'drop')
\ No newline at end of file
@@ -0,0 +1,477 @@
+"""Summarize the gateway access log: request rates, status codes and latency percentiles.
+
+Usage:
+    python -m app.log_analyzer --window 60
+    python -m app.log_analyzer --since 2h --by-endpoint
+    python -m app.log_analyzer --since 2024-05-01T12:00 --until 2024-05-01T13:00 --json
+    python -m app.log_analyzer /var/log/gateway/gateway.log.3
+
+Reads LOG_FILE and its rotated files (oldest first) through mmap in a single pass.
+Windows are printed as soon as the log has moved past them, so memory depends on
+the number of endpoints, not on the size of the log. --since/--until seek through
+a sparse timestamp index per file (.log-index/<inode>.idx next to the log), built on
+first use and extended incrementally as the file grows.
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+from app.config import Config
+
+EPOCH = datetime(1970, 1, 1)
+
+# Log entries are written by json.dumps with the timestamp first; the index only
+# needs this field, so it is matched on the raw bytes instead of parsing each line
+TIMESTAMP = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+INDEX_DIR = '.log-index'
+INDEX_VERSION = 1
+INDEX_BLOCK_BYTES = 1024 * 1024
+
+# Workers flush their batches independently, so entries can be a little out of order;
+# a window is closed once the log is this many seconds past its end
+WINDOW_GRACE = 30
+
+# Numeric path segments are ids (/api/movies/42 -> /api/movies/{id}), keeping one row per route
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+RELATIVE_TIME = re.compile(r'^(\d+)([smhd])$')
+RELATIVE_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_time(value):
+    """ISO date/time (UTC, like the log) or a duration before now such as 15m, 2h or 1d"""
+    match = RELATIVE_TIME.match(value)
+    if match:
+        moment = datetime.utcnow() - timedelta(**{RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+    else:
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid time: {value!r}")
+    # Compared with the logged isoformat() strings as they are
+    return moment.replace(tzinfo=None).isoformat()
+
+
+def log_files(path):
+    """path's rotated files (path.N ... path.1) followed by path itself, oldest first"""
+    directory, name = os.path.split(path)
+    pattern = re.compile(re.escape(name) + r'\.(\d+)$')
+    rotated = []
+    for entry in os.listdir(directory or '.'):
+        match = pattern.match(entry)
+        if match:
+            rotated.append((int(match.group(1)), os.path.join(directory, entry)))
+
+    files = [rotated_path for _, rotated_path in sorted(rotated, reverse=True)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def endpoint_template(method, endpoint):
+    return f"{method} {ID_SEGMENT.sub('/{id}', endpoint)}"
+
+
+class LatencyHistogram:
+    """Latencies counted in logarithmic buckets 2% wide: bounded size, percentiles within ~1%"""
+
+    BASE_MS = 0.01
+    GROWTH = math.log(1.02)
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0.0
+
+    def add(self, value):
+        bucket = 0 if value <= self.BASE_MS else math.ceil(math.log(value / self.BASE_MS) / self.GROWTH)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        if not self.total:
+            return None
+        rank = q / 100 * self.total
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return round(min(self.BASE_MS * math.exp(bucket * self.GROWTH), self.max), 3)
+        return self.max
+
+
+class RequestStats:
+    """Request count, status codes and latency histograms for one endpoint or window"""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.latency = LatencyHistogram()
+        self.upstream = LatencyHistogram()
+
+    def add(self, status, latency, upstream):
+        self.requests += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if isinstance(latency, (int, float)):
+            self.latency.add(latency)
+        if isinstance(upstream, (int, float)):
+            self.upstream.add(upstream)
+
+    def merge(self, other):
+        self.requests += other.requests
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.latency.merge(other.latency)
+        self.upstream.merge(other.upstream)
+
+    def summary(self, seconds):
+        classes = {f"{n}xx": 0 for n in range(1, 6)}
+        for status, count in self.statuses.items():
+            key = f"{str(status)[:1]}xx"
+            if key in classes:
+                classes[key] += count
+        return {
+            'requests': self.requests,
+            'rate': round(self.requests / max(seconds, 1), 3),
+            'status_classes': classes,
+            'status_codes': {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            'latency_ms': {
+                'p50': self.latency.percentile(50),
+                'p90': self.latency.percentile(90),
+                'p99': self.latency.percentile(99),
+                'max': self.latency.max if self.latency.total else None
+            },
+            'upstream_ms': {
+                'p50': self.upstream.percentile(50),
+                'p99': self.upstream.percentile(99)
+            }
+        }
+
+
+class LogAnalyzer:
+    """Single-pass aggregation of access log entries into fixed time windows and per-endpoint totals"""
+
+    def __init__(self, window, by_endpoint, emit):
+        self.window = window
+        self.by_endpoint = by_endpoint
+        self.emit = emit
+        self.windows = {}
+        self.closed_before = None
+        self.totals = {}
+        self.first = None
+        self.last = None
+        self.malformed = 0
+        self.late = 0
+
+    def add(self, entry):
+        """Count one parsed log entry; returns False for entries without the expected fields"""
+        try:
+            when = datetime.fromisoformat(entry['timestamp'])
+            endpoint = endpoint_template(entry['method'], entry['endpoint'])
+            status = entry['status_code']
+        except (KeyError, TypeError, ValueError):
+            self.malformed += 1
+            return False
+
+        latency, upstream = entry.get('latency_ms'), entry.get('upstream_ms')
+        self.first = when if self.first is None or when < self.first else self.first
+        self.last = when if self.last is None or when > self.last else self.last
+
+        totals = self.totals.get(endpoint)
+        if totals is None:
+            totals = self.totals[endpoint] = RequestStats()
+        totals.add(status, latency, upstream)
+
+        start = int((when - EPOCH).total_seconds() // self.window) * self.window
+        if self.closed_before is not None and start < self.closed_before:
+            # Written after its window was already reported; only the totals include it
+            self.late += 1
+            return True
+
+        stats = self.windows.get(start)
+        if stats is None:
+            stats = self.windows[start] = {}
+        key = endpoint if self.by_endpoint else None
+        if key not in stats:
+            stats[key] = RequestStats()
+        stats[key].add(status, latency, upstream)
+
+        self.close_windows((self.last - EPOCH).total_seconds() - WINDOW_GRACE)
+        return True
+
+    def close_windows(self, before=None):
+        """Emit (in order) and forget every window ending before the given epoch seconds; all if None"""
+        for start in sorted(self.windows):
+            if before is not None and start + self.window > before:
+                break
+            self.emit_window(start, self.windows.pop(start))
+            self.closed_before = start + self.window
+
+    def emit_window(self, start, stats):
+        total = RequestStats()
+        for endpoint_stats in stats.values():
+            total.merge(endpoint_stats)
+        record = {'type': 'window', 'start': (EPOCH + timedelta(seconds=start)).isoformat(), 'seconds': self.window}
+        record.update(total.summary(self.window))
+        if self.by_endpoint:
+            record['endpoints'] = {
+                endpoint: endpoint_stats.summary(self.window)
+                for endpoint, endpoint_stats in sorted(stats.items(), key=lambda item: -item[1].requests)
+            }
+        self.emit(record)
+
+    def finish(self):
+        """Emit the remaining windows, then per-endpoint totals and a summary record"""
+        self.close_windows()
+        seconds = (self.last - self.first).total_seconds() if self.first is not None else 0
+        total = RequestStats()
+        for endpoint, stats in sorted(self.totals.items(), key=lambda item: -item[1].requests):
+            total.merge(stats)
+            record = {'type': 'endpoint', 'endpoint': endpoint}
+            record.update(stats.summary(seconds))
+            self.emit(record)
+
+        record = {
+            'type': 'summary',
+            'first': self.first.isoformat() if self.first else None,
+            'last': self.last.isoformat() if self.last else None,
+            'malformed_lines': self.malformed,
+            'late_entries': self.late
+        }
+        record.update(total.summary(seconds))
+        self.emit(record)
+
+
+def scan_blocks(mm, start, block_bytes):
+    """(offset, min timestamp, max timestamp) for consecutive blocks of about block_bytes from start"""
+    blocks = []
+    mm.seek(start)
+    block_start, low, high = start, None, None
+    while True:
+        line = mm.readline()
+        if not line:
+            break
+        match = TIMESTAMP.search(line, 0, 128)
+        if match:
+            stamp = match.group(1).decode()
+            if low is None or stamp < low:
+                low = stamp
+            if high is None or stamp > high:
+                high = stamp
+        if mm.tell() - block_start >= block_bytes:
+            blocks.append((block_start, low, high))
+            block_start, low, high = mm.tell(), None, None
+    if block_start < mm.tell():
+        blocks.append((block_start, low, high))
+    return blocks
+
+
+def load_index(path, header):
+    """Blocks of a saved index if it belongs to this file (same inode and first bytes, not truncated)"""
+    try:
+        with open(path) as saved:
+            stored = json.loads(saved.readline())
+            if (stored.get('version') != INDEX_VERSION or stored.get('inode') != header['inode']
+                    or stored.get('head') != header['head'] or stored.get('size', 0) > header['size']):
+                return None, []
+            blocks = []
+            for line in saved:
+                offset, low, high = line.split()
+                blocks.append((int(offset), None if low == '-' else low, None if high == '-' else high))
+            return stored['size'], blocks
+    except (OSError, ValueError, KeyError):
+        return None, []
+
+
+def save_index(path, header, blocks):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'w') as out:
+            out.write(json.dumps(header) + '\n')
+            out.writelines(f"{offset} {low or '-'} {high or '-'}\n" for offset, low, high in blocks)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        print(f"Could not save index {path}: {str(e)}", file=sys.stderr)
+
+
+def file_index(log_path, mm, stat, use_saved=True):
+    """Sparse timestamp index of a log file, reusing and extending the saved one"""
+    header = {'version': INDEX_VERSION, 'inode': stat.st_ino, 'head': mm[:64].hex(), 'size': mm.size()}
+    path = os.path.join(os.path.dirname(log_path), INDEX_DIR, f"{stat.st_ino}.idx")
+
+    size, blocks = load_index(path, header) if use_saved else (None, [])
+    if size == mm.size():
+        return blocks
+
+    # The last indexed block may have grown since; rescan it along with everything after it
+    start = blocks.pop()[0] if blocks else 0
+    blocks.extend(scan_blocks(mm, start, INDEX_BLOCK_BYTES))
+    if use_saved:
+        save_index(path, header, blocks)
+    return blocks
+
+
+def prune_indexes(directory):
+    """Remove saved indexes of files that no longer exist (rotated out of the backups)"""
+    index_dir = os.path.join(directory, INDEX_DIR)
+    if not os.path.isdir(index_dir):
+        return
+    live = {str(entry.inode()) for entry in os.scandir(directory or '.') if entry.is_file()}
+    for entry in os.scandir(index_dir):
+        if entry.name.split('.')[0] not in live:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def byte_range(blocks, size, since, until):
+    """Offsets [start, end) that can hold entries in [since, until), given the index blocks"""
+    start, end = 0, size
+    if since is not None:
+        start = size
+        latest = None
+        for offset, _, high in blocks:
+            # Every entry before this block is older than latest
+            latest = high if latest is None or (high is not None and high > latest) else latest
+            if latest is not None and latest >= since:
+                start = offset
+                break
+    if until is not None:
+        earliest = None
+        for offset, low, _ in reversed(blocks):
+            # Every entry from this block on is at least earliest
+            earliest = low if earliest is None or (low is not None and low < earliest) else earliest
+            if earliest is not None and earliest < until:
+                break
+            end = offset
+    return start, end
+
+
+def analyze_file(path, analyzer, since, until, use_index):
+    """Feed the entries of one log file within [since, until) to the analyzer"""
+    with open(path, 'rb') as log:
+        stat = os.fstat(log.fileno())
+        if stat.st_size == 0:
+            return
+        with mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, end = 0, mm.size()
+            if since is not None or until is not None:
+                blocks = file_index(path, mm, stat, use_index)
+                start, end = byte_range(blocks, mm.size(), since, until)
+
+            mm.seek(start)
+            while mm.tell() < end:
+                line = mm.readline()
+                try:
+                    entry = json.loads(line)
+                    stamp = entry['timestamp']
+                except (ValueError, KeyError, TypeError):
+                    analyzer.malformed += 1
+                    continue
+                if (since is not None and stamp < since) or (until is not None and stamp >= until):
+                    continue
+                analyzer.add(entry)
+
+
+def format_ms(value):
+    return '-' if value is None else f"{value:.1f}"
+
+
+def text_line(label, record):
+    classes = record['status_classes']
+    latency = record['latency_ms']
+    return (
+        f"{label:<34} {record['requests']:>9} {record['rate']:>9.2f} "
+        f"{classes['2xx']:>8} {classes['3xx']:>7} {classes['4xx']:>7} {classes['5xx']:>7} "
+        f"{format_ms(latency['p50']):>8} {format_ms(latency['p90']):>8} "
+        f"{format_ms(latency['p99']):>8} {format_ms(latency['max']):>9}"
+    )
+
+
+def json_printer(out):
+    """Emit function writing one JSON object per record"""
+    def emit(record):
+        out.write(json.dumps(record) + '\n')
+    return emit
+
+
+def text_printer(out):
+    """Emit function writing records as aligned tables"""
+    header = (
+        f"{'':<34} {'requests':>9} {'req/s':>9} {'2xx':>8} {'3xx':>7} {'4xx':>7} {'5xx':>7} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>9}"
+    )
+    state = {'section': None}
+
+    def emit(record):
+        kind = record['type']
+        if kind != state['section']:
+            state['section'] = kind
+            if kind in ('window', 'endpoint'):
+                out.write(f"\n{'window start (UTC)' if kind == 'window' else 'endpoint':<34}{header[34:]}\n")
+
+        if kind == 'window':
+            out.write(text_line(record['start'], record) + '\n')
+            for endpoint, stats in record.get('endpoints', {}).items():
+                out.write(text_line(f"  {endpoint}", stats) + '\n')
+        elif kind == 'endpoint':
+            out.write(text_line(record['endpoint'], record) + '\n')
+        else:
+            out.write(f"\n{text_line('total', record)}\n")
+            out.write(
+                f"\n{record['first']} .. {record['last']}: {record['malformed_lines']} malformed lines, "
+                f"{record['late_entries']} late entries (counted in totals only)\n"
+            )
+    return emit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', help="log files to read in order (default: LOG_FILE and its rotations)")
+    parser.add_argument('--since', type=parse_time, help='first time to include, e.g. 2024-05-01T12:00 or 2h')
+    parser.add_argument('--until', type=parse_time, help='first time to exclude')
+    parser.add_argument('--window', type=int, default=60, help='window length in seconds (default: 60)')
+    parser.add_argument('--by-endpoint', action='store_true', help='break every window down by endpoint')
+    parser.add_argument('--json', action='store_true', help='write NDJSON records instead of tables')
+    parser.add_argument('--no-index', action='store_true', help='do not read or write saved timestamp indexes')
+    args = parser.parse_args()
+    if args.window < 1:
+        parser.error('--window must be positive')
+
+    files = args.files or log_files(Config.LOG_FILE)
+    if not files:
+        parser.error(f"no log files found at {Config.LOG_FILE}")
+
+    emit = json_printer(sys.stdout) if args.json else text_printer(sys.stdout)
+
+    analyzer = LogAnalyzer(args.window, args.by_endpoint, emit)
+    try:
+        for path in files:
+            analyze_file(path, analyzer, args.since, args.until, not args.no_index)
+        analyzer.finish()
+    except BrokenPipeError:
+        # Output piped into head/less that exited early
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+    if not args.no_index:
+        for directory in {os.path.dirname(path) for path in files}:
+            prune_indexes(directory)
+
+
+if __name__ == '__main__':
+    main()
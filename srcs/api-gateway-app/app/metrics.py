@@ -0,0 +1,87 @@
+import os
+import re
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+# Routes are labelled by their template (/api/movies/{movie_id}), never the raw path,
+# so label cardinality stays fixed however many ids are requested
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by route template',
+    ['method', 'route', 'status']
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled',
+    ['route'], multiprocess_mode='livesum'
+)
+UPSTREAM_LATENCY = Histogram(
+    'gateway_upstream_request_duration_seconds', 'Upstream call time until response headers',
+    ['service', 'method', 'outcome']
+)
+PUBLISH_LATENCY = Histogram(
+    'gateway_order_publish_duration_seconds', 'Time to get a publisher confirm for an order, or to spool it',
+    ['outcome']
+)
+STOCK_HINT_REJECTIONS = Counter(
+    'gateway_stock_hint_rejections_total', 'Orders turned away on a fresh stock hint without calling inventory'
+)
+
+
+def status_class(status_code):
+    return 'error' if status_code is None else f"{status_code // 100}xx"
+
+
+def observe_upstream(service, method, status_code, seconds):
+    UPSTREAM_LATENCY.labels(service, method, status_class(status_code)).observe(seconds)
+
+
+def observe_publish(outcome, started):
+    PUBLISH_LATENCY.labels(outcome).observe(time.perf_counter() - started)
+
+
+_RULE_ARGUMENT = re.compile(r'<(?:[^<>:]+:)?([^<>]+)>')
+
+
+def route_label(template):
+    """Metrics label for a route template, the same for both engines: Flask's <int:movie_id> becomes {movie_id}"""
+    return _RULE_ARGUMENT.sub(r'{\1}', template)
+
+
+def render_metrics():
+    """Metrics in Prometheus text format, merged across worker processes in multiprocess mode"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def init_metrics(app):
+    """Record per-route latency and in-flight requests, and serve them at /metrics"""
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_route = route_label(request.url_rule.rule) if request.url_rule else 'unmatched'
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(g.metrics_route).inc()
+
+    @app.after_request
+    def observe_request(response):
+        if 'metrics_start' in g:
+            REQUEST_LATENCY.labels(request.method, g.metrics_route, str(response.status_code)).observe(
+                time.perf_counter() - g.metrics_start
+            )
+        return response
+
+    @app.teardown_request
+    def finish_metrics(exc):
+        if 'metrics_route' in g:
+            REQUESTS_IN_FLIGHT.labels(g.metrics_route).dec()
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), headers={'Content-Type': CONTENT_TYPE_LATEST})
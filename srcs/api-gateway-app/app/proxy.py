@@ -1,219 +1,469 @@
-from flask import Blueprint, jsonify, request, current_app
-import requests
-import pika
-import json
-import logging
-from datetime import datetime
-
-gateway_bp = Blueprint('gateway', __name__)
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-def log_request(endpoint, method, status_code):
-    """Log request to file"""
-    try:
-        log_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'endpoint': endpoint,
-            'method': method,
-            'status_code': status_code
-        }
-        
-        log_file = current_app.config['LOG_FILE']
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
-    except Exception as e:
-        logger.error(f"Error logging request: {str(e)}")
-
-def send_to_queue(data):
-    """Send message to RabbitMQ queue"""
-    try:
-        config = current_app.config
-        
-        credentials = pika.PlainCredentials(
-            config['RABBITMQ_USER'],
-            config['RABBITMQ_PASSWORD']
-        )
-        
-        parameters = pika.ConnectionParameters(
-            host=config['RABBITMQ_HOST'],
-            port=int(config['RABBITMQ_PORT']),
-            credentials=credentials
-        )
-        
-        connection = pika.BlockingConnection(parameters)
-        channel = connection.channel()
-        
-        # Declare queue
-        channel.queue_declare(queue=config['RABBITMQ_QUEUE'], durable=True)
-        
-        # Publish message
-        channel.basic_publish(
-            exchange='',
-            routing_key=config['RABBITMQ_QUEUE'],
-            body=json.dumps(data),
-            properties=pika.BasicProperties(
-                delivery_mode=2,  # Make message persistent
-            )
-        )
-        
-        connection.close()
-        logger.info(f"Message sent to queue: {data}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error sending message to queue: {str(e)}")
-        return False
-
-# ==================== HEALTH CHECK ====================
-@gateway_bp.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'service': 'api-gateway'}), 200
-
-# ==================== INVENTORY ROUTES ====================
-@gateway_bp.route('/api/movies', methods=['GET'])
-def get_movies():
-    """Get all movies from inventory service"""
-    try:
-        url = f"{current_app.config['INVENTORY_SERVICE_URL']}/api/movies"
-        response = requests.get(url, timeout=5)
-        log_request('/api/movies', 'GET', response.status_code)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        logger.error(f"Error fetching movies: {str(e)}")
-        log_request('/api/movies', 'GET', 500)
-        return jsonify({'error': 'Failed to fetch movies'}), 500
-
-@gateway_bp.route('/api/movies/<int:movie_id>', methods=['GET'])
-def get_movie(movie_id):
-    """Get a specific movie from inventory service"""
-    try:
-        url = f"{current_app.config['INVENTORY_SERVICE_URL']}/api/movies/{movie_id}"
-        response = requests.get(url, timeout=5)
-        log_request(f'/api/movies/{movie_id}', 'GET', response.status_code)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        logger.error(f"Error fetching movie {movie_id}: {str(e)}")
-        log_request(f'/api/movies/{movie_id}', 'GET', 500)
-        return jsonify({'error': 'Failed to fetch movie'}), 500
-
-@gateway_bp.route('/api/movies', methods=['POST'])
-def create_movie():
-    """Create a new movie in inventory service"""
-    try:
-        url = f"{current_app.config['INVENTORY_SERVICE_URL']}/api/movies"
-        response = requests.post(url, json=request.get_json(), timeout=5)
-        log_request('/api/movies', 'POST', response.status_code)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        logger.error(f"Error creating movie: {str(e)}")
-        log_request('/api/movies', 'POST', 500)
-        return jsonify({'error': 'Failed to create movie'}), 500
-
-# ==================== BILLING ROUTES ====================
-@gateway_bp.route('/api/orders', methods=['GET'])
-def get_orders():
-    """Get all orders from billing service"""
-    try:
-        url = f"{current_app.config['BILLING_SERVICE_URL']}/api/orders"
-        response = requests.get(url, timeout=5)
-        log_request('/api/orders', 'GET', response.status_code)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        logger.error(f"Error fetching orders: {str(e)}")
-        log_request('/api/orders', 'GET', 500)
-        return jsonify({'error': 'Failed to fetch orders'}), 500
-
-@gateway_bp.route('/api/orders/<int:order_id>', methods=['GET'])
-def get_order(order_id):
-    """Get a specific order from billing service"""
-    try:
-        url = f"{current_app.config['BILLING_SERVICE_URL']}/api/orders/{order_id}"
-        response = requests.get(url, timeout=5)
-        log_request(f'/api/orders/{order_id}', 'GET', response.status_code)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        logger.error(f"Error fetching order {order_id}: {str(e)}")
-        log_request(f'/api/orders/{order_id}', 'GET', 500)
-        return jsonify({'error': 'Failed to fetch order'}), 500
-
-@gateway_bp.route('/api/orders/user/<int:user_id>', methods=['GET'])
-def get_user_orders(user_id):
-    """Get all orders for a specific user"""
-    try:
-        url = f"{current_app.config['BILLING_SERVICE_URL']}/api/orders/user/{user_id}"
-        response = requests.get(url, timeout=5)
-        log_request(f'/api/orders/user/{user_id}', 'GET', response.status_code)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        logger.error(f"Error fetching user orders: {str(e)}")
-        log_request(f'/api/orders/user/{user_id}', 'GET', 500)
-        return jsonify({'error': 'Failed to fetch user orders'}), 500
-
-# ==================== ORDER CREATION (with Queue) ====================
-@gateway_bp.route('/api/orders', methods=['POST'])
-def create_order():
-    """Create a new order and send to RabbitMQ queue"""
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['user_id', 'movie_id', 'quantity']
-        if not all(field in data for field in required_fields):
-            return jsonify({'error': 'Missing required fields'}), 400
-        
-        # Get movie details from inventory
-        movie_url = f"{current_app.config['INVENTORY_SERVICE_URL']}/api/movies/{data['movie_id']}"
-        movie_response = requests.get(movie_url, timeout=5)
-        
-        if movie_response.status_code != 200:
-            return jsonify({'error': 'Movie not found'}), 404
-        
-        movie = movie_response.json()
-        
-        # Check stock availability
-        if movie['stock'] < data['quantity']:
-            return jsonify({'error': 'Insufficient stock'}), 400
-        
-        # Reduce stock in inventory
-        reduce_stock_url = f"{current_app.config['INVENTORY_SERVICE_URL']}/api/movies/{data['movie_id']}/reduce-stock"
-        stock_response = requests.post(
-            reduce_stock_url,
-            json={'quantity': data['quantity']},
-            timeout=5
-        )
-        
-        if stock_response.status_code != 200:
-            return jsonify({'error': 'Failed to reduce stock'}), 500
-        
-        # Prepare order data
-        order_data = {
-            'user_id': data['user_id'],
-            'movie_id': data['movie_id'],
-            'movie_title': movie['title'],
-            'quantity': data['quantity'],
-            'price': movie['price'],
-            'total_amount': movie['price'] * data['quantity']
-        }
-        
-        # Send to RabbitMQ queue
-        if send_to_queue(order_data):
-            log_request('/api/orders', 'POST', 202)
-            return jsonify({
-                'message': 'Order received and queued for processing',
-                'order_data': order_data
-            }), 202
-        else:
-            log_request('/api/orders', 'POST', 500)
-            return jsonify({'error': 'Failed to queue order'}), 500
-        
-    except Exception as e:
-        logger.error(f"Error creating order: {str(e)}")
-        log_request('/api/orders', 'POST', 500)
+from flask import Blueprint, Response, g, jsonify, make_response, request, current_app
+import logging
+import threading
+import time
+from datetime import datetime
+from app.access_log import get_access_log, start_upstream_timer, upstream_time_ms
+from app.cache import CACHE_STATUS, CachedResponse, etag_matches, get_cache
+from app.metrics import STOCK_HINT_REJECTIONS
+from app.publisher import get_publisher
+from app.singleflight import get_single_flight
+from app.stock_hints import get_stock_hints
+from app.upstream import CircuitOpenError, inventory_service, billing_service
+
+gateway_bp = Blueprint('gateway', __name__)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REQUIRED_ORDER_FIELDS = ['user_id', 'movie_id', 'quantity']
+
+# Upstream headers that are safe to relay verbatim in passthrough mode
+PASSTHROUGH_HEADERS = (
+    'Content-Type', 'Content-Length', 'Content-Encoding',
+    'ETag', 'Last-Modified', 'Cache-Control', 'X-Next-After-Id'
+)
+
+# Headers kept with cached bodies (length/encoding are recomputed on the way out)
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'X-Next-After-Id')
+
+# Validators relayed on 304s and re-encoded bodies, and the client preconditions forwarded upstream
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+@gateway_bp.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    start_upstream_timer()
+
+def log_request(endpoint, method, status_code):
+    """Queue a request log entry for the background log writer"""
+    try:
+        log_entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'endpoint': endpoint,
+            'method': method,
+            'status_code': status_code,
+            'latency_ms': round((time.perf_counter() - g.request_start) * 1000, 3),
+            'upstream_ms': upstream_time_ms()
+        }
+        
+        get_access_log().write(log_entry)
+    except Exception as e:
+        logger.error(f"Error logging request: {str(e)}")
+
+def send_to_queue(data):
+    """Send message to RabbitMQ queue"""
+    try:
+        if get_publisher().publish(data):
+            logger.info(f"Message sent to queue: {data}")
+            return True
+        return False
+        
+    except Exception as e:
+        logger.error(f"Error sending message to queue: {str(e)}")
+        return False
+
+def build_order_data(data, movie):
+    """Build the order message published to the billing queue"""
+    return {
+        'user_id': data['user_id'],
+        'movie_id': data['movie_id'],
+        'movie_title': movie['title'],
+        'quantity': data['quantity'],
+        'price': movie['price'],
+        'total_amount': movie['price'] * data['quantity']
+    }
+
+def relay(response):
+    """Return an upstream response to the client, streaming it unparsed in passthrough mode"""
+    if response.status_code == 304 or current_app.config['PROXY_PASSTHROUGH'] != 'true':
+        try:
+            validators = {
+                name: response.headers[name]
+                for name in VALIDATOR_HEADERS if name in response.headers
+            }
+            if response.status_code == 304:
+                return Response(status=304, headers=validators)
+            # Always a Response: callers such as cached_get read .status_code from it
+            return make_response(jsonify(response.json()), response.status_code, validators)
+        finally:
+            response.close()
+    
+    chunk_size = int(current_app.config['PROXY_CHUNK_SIZE'])
+    
+    def generate():
+        try:
+            # Forward the raw (still encoded) bytes so nothing is decoded or re-serialized
+            for chunk in response.raw.stream(chunk_size, decode_content=False):
+                yield chunk
+        finally:
+            response.close()
+    
+    headers = {
+        name: response.headers[name]
+        for name in PASSTHROUGH_HEADERS if name in response.headers
+    }
+    return Response(generate(), status=response.status_code, headers=headers)
+
+def with_query(path):
+    """Append the client's query string (pagination/streaming args) to an upstream path"""
+    query = request.query_string.decode()
+    return f"{path}?{query}" if query else path
+
+def conditional_headers():
+    """The client's validators, forwarded on uncached reads so upstream can answer 304"""
+    return {name: request.headers[name] for name in CONDITIONAL_HEADERS if name in request.headers}
+
+def fetch_cacheable(upstream, path, etag=None):
+    """Fetch an upstream GET fully into a cache entry; with etag, an unchanged resource comes back as a 304"""
+    response = upstream.get(path, headers={'If-None-Match': etag} if etag else None)
+    headers = {
+        name: response.headers[name]
+        for name in CACHED_HEADERS if name in response.headers
+    }
+    return CachedResponse(response.status_code, headers, response.content)
+
+def fetch_entry(upstream, path, coalesce, etag=None):
+    """Fetch a cache entry; with coalesce, concurrent identical requests share one upstream call"""
+    if not coalesce:
+        return fetch_cacheable(upstream, path, etag)
+    # Revalidations only coalesce with each other; a 304 is no answer to a plain fetch
+    return get_single_flight().do(
+        f"{upstream.name}:{path}" + (f" {etag}" if etag else ''),
+        lambda: fetch_cacheable(upstream, path, etag),
+        timeout=float(current_app.config['COALESCE_TIMEOUT'])
+    )
+
+def refresh_entry(cache, upstream, path, key, stale):
+    """Revalidate or re-fetch a stale cache entry in the background"""
+    try:
+        entry = fetch_cacheable(upstream, path, stale.headers.get('ETag'))
+        if entry.status == 304:
+            cache.touch(key, stale)
+        elif entry.status == 200:
+            cache.store(key, entry)
+    except Exception as e:
+        logger.warning(f"Error refreshing cached {path}: {str(e)}")
+    finally:
+        cache.end_refresh(key)
+
+def cached_get(upstream, path, key, coalesce=False):
+    """Serve an upstream GET from the response cache, revalidating stale entries in the background"""
+    coalesce = coalesce and current_app.config['COALESCE_ENABLED'] == 'true'
+    if current_app.config['CACHE_ENABLED'] != 'true':
+        if not coalesce:
+            return relay(upstream.get(path, stream=True, headers=conditional_headers()))
+        return entry_response(fetch_entry(upstream, path, coalesce))
+    
+    cache = get_cache()
+    entry, state = cache.lookup(key)
+    
+    if state == 'stale' and cache.begin_refresh(key):
+        threading.Thread(
+            target=refresh_entry, args=(cache, upstream, path, key, entry), daemon=True
+        ).start()
+    
+    if state == 'expired':
+        # Ask upstream whether our copy is still current; a 304 skips its serialization and the transfer
+        fetched = fetch_entry(upstream, path, coalesce, entry.headers['ETag'])
+        if fetched.status == 304:
+            cache.touch(key, entry)
+            state = 'revalidated'
+        else:
+            entry, state = fetched, 'miss'
+            if entry.status == 200:
+                cache.store(key, entry)
+            else:
+                cache.invalidate(key)
+    
+    if entry is None:
+        entry = fetch_entry(upstream, path, coalesce)
+        if entry.status == 200:
+            cache.store(key, entry)
+        state = 'miss'
+    
+    return entry_response(entry, state)
+
+def entry_response(entry, state=None):
+    """Answer from a fetched or cached entry, or 304 when the client's If-None-Match matches it"""
+    headers = dict(entry.headers)
+    if state is not None:
+        headers['X-Cache'] = CACHE_STATUS[state]
+    if entry.status == 200 and etag_matches(request.headers.get('If-None-Match'), entry.headers.get('ETag')):
+        headers.pop('Content-Type', None)
+        return Response(status=304, headers=headers)
+    return Response(entry.body, status=entry.status, headers=headers)
+
+def invalidate_movies(movie_id=None):
+    """Drop cached catalog entries after the gateway changed inventory"""
+    if current_app.config['CACHE_ENABLED'] != 'true':
+        return
+    cache = get_cache()
+    cache.invalidate_prefix('movies:list')
+    cache.invalidate_prefix('movies:search')
+    if movie_id is not None:
+        cache.invalidate(f'movies:{movie_id}')
+
+# ==================== HEALTH CHECK ====================
+@gateway_bp.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({'status': 'healthy', 'service': 'api-gateway'}), 200
+
+@gateway_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Response cache and request coalescing counters for this worker"""
+    return jsonify(dict(get_cache().stats(), single_flight=get_single_flight().stats(),
+                        stock_hints=get_stock_hints().stats())), 200
+
+# ==================== INVENTORY ROUTES ====================
+@gateway_bp.route('/api/movies', methods=['GET'])
+def get_movies():
+    """Get all movies from inventory service"""
+    try:
+        path = with_query('/api/movies')
+        if 'stream' in request.args:
+            # Streamed listings go straight through; they are too large to buffer and cache
+            response = inventory_service().get(path, stream=True, headers=conditional_headers())
+            log_request('/api/movies', 'GET', response.status_code)
+            return relay(response)
+        
+        response = cached_get(inventory_service(), path, f"movies:list{path[len('/api/movies'):]}",
+                              coalesce=True)
+        log_request('/api/movies', 'GET', response.status_code)
+        return response
+    except CircuitOpenError:
+        log_request('/api/movies', 'GET', 503)
+        return jsonify({'error': 'Inventory service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching movies: {str(e)}")
+        log_request('/api/movies', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch movies'}), 500
+
+@gateway_bp.route('/api/movies/search', methods=['GET'])
+def search_movies():
+    """Search the catalog through inventory service"""
+    try:
+        path = with_query('/api/movies/search')
+        response = cached_get(inventory_service(), path, f"movies:search{path[len('/api/movies/search'):]}",
+                              coalesce=True)
+        log_request('/api/movies/search', 'GET', response.status_code)
+        return response
+    except CircuitOpenError:
+        log_request('/api/movies/search', 'GET', 503)
+        return jsonify({'error': 'Inventory service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error searching movies: {str(e)}")
+        log_request('/api/movies/search', 'GET', 500)
+        return jsonify({'error': 'Failed to search movies'}), 500
+
+@gateway_bp.route('/api/movies/<int:movie_id>', methods=['GET'])
+def get_movie(movie_id):
+    """Get a specific movie from inventory service"""
+    try:
+        response = cached_get(inventory_service(), f"/api/movies/{movie_id}", f'movies:{movie_id}',
+                              coalesce=True)
+        log_request(f'/api/movies/{movie_id}', 'GET', response.status_code)
+        return response
+    except CircuitOpenError:
+        log_request(f'/api/movies/{movie_id}', 'GET', 503)
+        return jsonify({'error': 'Inventory service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching movie {movie_id}: {str(e)}")
+        log_request(f'/api/movies/{movie_id}', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch movie'}), 500
+
+@gateway_bp.route('/api/movies', methods=['POST'])
+def create_movie():
+    """Create a new movie in inventory service"""
+    try:
+        response = inventory_service().post('/api/movies', json=request.get_json(), stream=True)
+        log_request('/api/movies', 'POST', response.status_code)
+        if response.status_code == 201:
+            invalidate_movies()
+        return relay(response)
+    except CircuitOpenError:
+        log_request('/api/movies', 'POST', 503)
+        return jsonify({'error': 'Inventory service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error creating movie: {str(e)}")
+        log_request('/api/movies', 'POST', 500)
+        return jsonify({'error': 'Failed to create movie'}), 500
+
+@gateway_bp.route('/api/movies/bulk', methods=['POST'])
+def bulk_import_movies():
+    """Stream a bulk catalog import (NDJSON or CSV) to inventory service without buffering it"""
+    try:
+        chunk_size = int(current_app.config['PROXY_CHUNK_SIZE'])
+        response = inventory_service().post(
+            '/api/movies/bulk',
+            data=iter(lambda: request.stream.read(chunk_size), b''),
+            headers={'Content-Type': request.content_type or ''},
+            timeout=(float(current_app.config['UPSTREAM_CONNECT_TIMEOUT']),
+                     float(current_app.config['BULK_IMPORT_TIMEOUT'])),
+            stream=True
+        )
+        log_request('/api/movies/bulk', 'POST', response.status_code)
+        if response.status_code == 200:
+            invalidate_movies()
+            # Imports set stock outside a reduce-stock reply, so every hint may be stale now
+            if current_app.config['STOCK_HINTS_ENABLED'] == 'true':
+                get_stock_hints().forget()
+        return relay(response)
+    except CircuitOpenError:
+        log_request('/api/movies/bulk', 'POST', 503)
+        return jsonify({'error': 'Inventory service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error importing movies: {str(e)}")
+        log_request('/api/movies/bulk', 'POST', 500)
+        return jsonify({'error': 'Failed to import movies'}), 500
+
+# ==================== BILLING ROUTES ====================
+@gateway_bp.route('/api/orders', methods=['GET'])
+def get_orders():
+    """Get all orders from billing service"""
+    try:
+        response = billing_service().get(with_query('/api/orders'), stream=True,
+                                         headers=conditional_headers())
+        log_request('/api/orders', 'GET', response.status_code)
+        return relay(response)
+    except CircuitOpenError:
+        log_request('/api/orders', 'GET', 503)
+        return jsonify({'error': 'Billing service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching orders: {str(e)}")
+        log_request('/api/orders', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch orders'}), 500
+
+@gateway_bp.route('/api/orders/<int:order_id>', methods=['GET'])
+def get_order(order_id):
+    """Get a specific order from billing service"""
+    try:
+        response = billing_service().get(f"/api/orders/{order_id}", stream=True,
+                                         headers=conditional_headers())
+        log_request(f'/api/orders/{order_id}', 'GET', response.status_code)
+        return relay(response)
+    except CircuitOpenError:
+        log_request(f'/api/orders/{order_id}', 'GET', 503)
+        return jsonify({'error': 'Billing service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching order {order_id}: {str(e)}")
+        log_request(f'/api/orders/{order_id}', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch order'}), 500
+
+@gateway_bp.route('/api/orders/user/<int:user_id>', methods=['GET'])
+def get_user_orders(user_id):
+    """Get all orders for a specific user"""
+    try:
+        response = billing_service().get(with_query(f"/api/orders/user/{user_id}"), stream=True,
+                                         headers=conditional_headers())
+        log_request(f'/api/orders/user/{user_id}', 'GET', response.status_code)
+        return relay(response)
+    except CircuitOpenError:
+        log_request(f'/api/orders/user/{user_id}', 'GET', 503)
+        return jsonify({'error': 'Billing service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching user orders: {str(e)}")
+        log_request(f'/api/orders/user/{user_id}', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch user orders'}), 500
+
+# ==================== SALES STATS ROUTES ====================
+@gateway_bp.route('/api/stats/movies/<int:movie_id>', methods=['GET'])
+def get_movie_stats(movie_id):
+    """Get sales totals for a movie from billing service"""
+    try:
+        response = billing_service().get(f"/api/stats/movies/{movie_id}", stream=True,
+                                         headers=conditional_headers())
+        log_request(f'/api/stats/movies/{movie_id}', 'GET', response.status_code)
+        return relay(response)
+    except CircuitOpenError:
+        log_request(f'/api/stats/movies/{movie_id}', 'GET', 503)
+        return jsonify({'error': 'Billing service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching movie stats: {str(e)}")
+        log_request(f'/api/stats/movies/{movie_id}', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch movie stats'}), 500
+
+@gateway_bp.route('/api/stats/daily', methods=['GET'])
+def get_daily_stats():
+    """Get per-day sales totals from billing service"""
+    try:
+        response = billing_service().get(with_query('/api/stats/daily'), stream=True,
+                                         headers=conditional_headers())
+        log_request('/api/stats/daily', 'GET', response.status_code)
+        return relay(response)
+    except CircuitOpenError:
+        log_request('/api/stats/daily', 'GET', 503)
+        return jsonify({'error': 'Billing service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error fetching daily stats: {str(e)}")
+        log_request('/api/stats/daily', 'GET', 500)
+        return jsonify({'error': 'Failed to fetch daily stats'}), 500
+
+# ==================== ORDER CREATION (with Queue) ====================
+@gateway_bp.route('/api/orders', methods=['POST'])
+def create_order():
+    """Create a new order and send to RabbitMQ queue"""
+    try:
+        data = request.get_json()
+        
+        # Validate required fields
+        if not all(field in data for field in REQUIRED_ORDER_FIELDS):
+            return jsonify({'error': 'Missing required fields'}), 400
+        
+        # Turn away orders a fresh stock hint already shows cannot be met
+        hints = get_stock_hints() if current_app.config['STOCK_HINTS_ENABLED'] == 'true' else None
+        if hints is not None and hints.available(data['movie_id'], data['quantity']) is not None:
+            STOCK_HINT_REJECTIONS.inc()
+            return jsonify({'error': 'Insufficient stock'}), 400
+        
+        # Reserve stock atomically; inventory returns the movie details we need
+        stock_response = inventory_service().post(
+            f"/api/movies/{data['movie_id']}/reduce-stock",
+            json={'quantity': data['quantity']}
+        )
+        
+        if stock_response.status_code == 404:
+            return jsonify({'error': 'Movie not found'}), 404
+        
+        if stock_response.status_code == 400:
+            body = stock_response.json()
+            if hints is not None and 'available' in body:
+                hints.observe(body.get('movie_id'), body['available'])
+            return jsonify({'error': body.get('error', 'Insufficient stock')}), 400
+        
+        if stock_response.status_code != 200:
+            return jsonify({'error': 'Failed to reduce stock'}), 500
+        
+        movie = stock_response.json()
+        if hints is not None:
+            hints.observe(movie.get('id'), movie.get('stock'))
+        
+        invalidate_movies(data['movie_id'])
+        
+        # Prepare order data
+        order_data = build_order_data(data, movie)
+        
+        # Send to RabbitMQ queue
+        if send_to_queue(order_data):
+            log_request('/api/orders', 'POST', 202)
+            return jsonify({
+                'message': 'Order received and queued for processing',
+                'order_data': order_data
+            }), 202
+        else:
+            log_request('/api/orders', 'POST', 500)
+            return jsonify({'error': 'Failed to queue order'}), 500
+        
+    except CircuitOpenError:
+        log_request('/api/orders', 'POST', 503)
+        return jsonify({'error': 'Inventory service unavailable'}), 503
+    except Exception as e:
+        logger.error(f"Error creating order: {str(e)}")
+        log_request('/api/orders', 'POST', 500)
         return jsonify({'error': 'Failed to create order'}), 500
\ No newline at end of file
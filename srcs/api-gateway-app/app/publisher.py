@@ -0,0 +1,287 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pika
+from pika.exceptions import AMQPError
+from flask import current_app
+
+from app.metrics import observe_publish
+
+logger = logging.getLogger(__name__)
+
+_publisher_lock = threading.Lock()
+
+
+class OrderPublisher:
+    """Pooled, long-lived RabbitMQ publisher with publisher confirms and a local spool"""
+
+    def __init__(self, config):
+        credentials = pika.PlainCredentials(
+            config['RABBITMQ_USER'],
+            config['RABBITMQ_PASSWORD']
+        )
+        self.parameters = pika.ConnectionParameters(
+            host=config['RABBITMQ_HOST'],
+            port=int(config['RABBITMQ_PORT']),
+            credentials=credentials,
+            heartbeat=int(config['RABBITMQ_HEARTBEAT']),
+            blocked_connection_timeout=int(config['RABBITMQ_BLOCKED_TIMEOUT']),
+            socket_timeout=float(config['RABBITMQ_CONNECT_TIMEOUT']),
+            stack_timeout=float(config['RABBITMQ_CONNECT_TIMEOUT'])
+        )
+        self.queue = config['RABBITMQ_QUEUE']
+        self.spool_file = config['RABBITMQ_SPOOL_FILE']
+        self.acquire_timeout = float(config['RABBITMQ_POOL_TIMEOUT'])
+        self.retry_interval = float(config['RABBITMQ_RETRY_INTERVAL'])
+        self.check_interval = float(config['RABBITMQ_SPOOL_CHECK_INTERVAL'])
+
+        # BlockingConnection is not thread-safe, so every channel is checked
+        # out exclusively; the semaphore caps how many connections we hold.
+        self._slots = threading.BoundedSemaphore(int(config['RABBITMQ_POOL_SIZE']))
+        self._idle = []
+        self._idle_lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._drain_thread = None
+        self._declared = False
+        self._retry_after = 0.0
+
+        adopt_stale_spools(self.spool_file)
+        if self.check_interval > 0:
+            threading.Thread(target=self._watch_spool, name='spool-watch', daemon=True).start()
+
+    def _open(self):
+        """Open a connection and a confirm-mode channel"""
+        connection = pika.BlockingConnection(self.parameters)
+        channel = connection.channel()
+        channel.confirm_delivery()
+
+        # Declare queue once per process (and again after a reconnect)
+        if not self._declared:
+            channel.queue_declare(queue=self.queue, durable=True)
+            self._declared = True
+
+        return connection, channel
+
+    def _checkout(self):
+        with self._idle_lock:
+            return self._idle.pop() if self._idle else None
+
+    def _checkin(self, conn):
+        with self._idle_lock:
+            self._idle.append(conn)
+
+    def _discard(self, conn):
+        if conn is None:
+            return
+        try:
+            conn[0].close()
+        except Exception:
+            pass
+
+    def _publish(self, body):
+        """Publish one message and wait for its confirm, reconnecting once on failure"""
+        # While the broker is known to be down, spool straight away instead
+        # of paying a connection attempt on every request
+        if time.monotonic() < self._retry_after:
+            raise ConnectionError('Broker marked unavailable')
+
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise RuntimeError('No publisher channel available')
+
+        try:
+            last_error = None
+            for _ in range(2):
+                conn = self._checkout()
+                try:
+                    if conn is None:
+                        conn = self._open()
+                    connection, channel = conn
+
+                    # Service heartbeats on connections that sat idle in the pool
+                    connection.process_data_events(time_limit=0)
+
+                    # Blocks until the broker acks (raises on nack/unroutable)
+                    channel.basic_publish(
+                        exchange='',
+                        routing_key=self.queue,
+                        body=body,
+                        properties=pika.BasicProperties(
+                            delivery_mode=2,  # Make message persistent
+                            content_type='application/json'
+                        ),
+                        mandatory=True
+                    )
+                except (AMQPError, OSError) as e:
+                    last_error = e
+                    self._discard(conn)
+                    self._declared = False
+                    continue
+
+                self._checkin(conn)
+                return
+
+            self._retry_after = time.monotonic() + self.retry_interval
+            raise last_error
+        finally:
+            self._slots.release()
+
+    def publish(self, data):
+        """Publish an order, spooling it to disk if the broker is unreachable"""
+        body = json.dumps(data)
+        started = time.perf_counter()
+
+        try:
+            self._publish(body)
+        except Exception as e:
+            logger.warning(f"Broker unavailable, spooling message: {str(e)}")
+            spooled = self._spool(body)
+            observe_publish('spooled' if spooled else 'failed', started)
+            return spooled
+
+        observe_publish('confirmed', started)
+        self._maybe_drain()
+        return True
+
+    def _spool(self, body):
+        try:
+            spool_messages(self.spool_file, [body])
+            return True
+        except OSError as e:
+            logger.error(f"Error spooling message: {str(e)}")
+            return False
+
+    def _maybe_drain(self):
+        """Kick off a background drain if earlier messages were spooled"""
+        if not os.path.exists(self.spool_file):
+            return
+        with self._drain_lock:
+            if self._drain_thread is not None and self._drain_thread.is_alive():
+                return
+            self._drain_thread = threading.Thread(target=self.drain_spool, daemon=True)
+            self._drain_thread.start()
+
+    def _watch_spool(self):
+        """Retry spooled messages periodically, so they do not wait for the next confirmed order"""
+        while True:
+            time.sleep(self.check_interval)
+            if time.monotonic() >= self._retry_after:
+                self._maybe_drain()
+
+    def drain_spool(self):
+        """Republish spooled messages now that the broker is reachable again"""
+        draining, pending = claim_spool(self.spool_file)
+        if draining is None:
+            return
+
+        sent = 0
+        try:
+            for body in pending:
+                self._publish(body)
+                sent += 1
+        except Exception as e:
+            logger.warning(f"Spool drain interrupted after {sent} messages: {str(e)}")
+
+        try:
+            release_spool(self.spool_file, draining, pending[sent:])
+        except OSError as e:
+            logger.error(f"Error releasing {draining}, left for recovery: {str(e)}")
+        logger.info(f"Republished {sent} spooled messages")
+
+
+@contextmanager
+def spool_lock(spool_file):
+    """Exclusive lock on the spool shared by all worker processes and their threads"""
+    with open(f"{spool_file}.lock", 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def spool_messages(spool_file, bodies):
+    """Append message bodies to the local spool file"""
+    with spool_lock(spool_file), open(spool_file, 'a') as f:
+        f.writelines(body + '\n' for body in bodies)
+
+
+def claim_spool(spool_file):
+    """Atomically take over the spool file; returns (claimed path, messages), or (None, []) if there is none.
+
+    The claimed file stays on disk until release_spool, so messages of a worker that
+    dies mid-drain are recovered by adopt_stale_spools instead of lost.
+    """
+    draining = f"{spool_file}.{os.getpid()}.draining"
+
+    # No worker can be appending while we hold the lock, so nothing lands in the
+    # claimed file after it was read
+    with spool_lock(spool_file):
+        try:
+            os.replace(spool_file, draining)
+        except FileNotFoundError:
+            return None, []
+
+    return draining, read_spool(draining)
+
+
+def release_spool(spool_file, draining, unsent):
+    """Finish a drain: put unsent messages back on the spool, then delete the claimed file"""
+    if unsent:
+        spool_messages(spool_file, unsent)
+    os.remove(draining)
+
+
+def read_spool(path):
+    with open(path) as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def adopt_stale_spools(spool_file):
+    """Put messages from .draining files of workers that died mid-drain back on the spool.
+
+    Messages confirmed before the crash are published again; the consumer is at-least-once anyway.
+    """
+    pattern = f"{glob.escape(spool_file)}.*.draining"
+    for path in glob.glob(pattern):
+        pid = path[len(spool_file) + 1:-len('.draining')]
+        # Our own pid can only be stale here: this runs before the worker's first drain
+        if pid.isdigit() and int(pid) != os.getpid() and process_alive(int(pid)):
+            continue
+
+        adopted = f"{spool_file}.{os.getpid()}.draining"
+        try:
+            if path != adopted:
+                # Atomic, so only one worker adopts a given file
+                os.replace(path, adopted)
+            release_spool(spool_file, adopted, read_spool(adopted))
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.error(f"Error recovering spooled messages from {path}: {str(e)}")
+            continue
+        logger.warning(f"Recovered spooled messages left in {path}")
+
+
+def get_publisher():
+    """Return this worker's publisher, creating it on first use"""
+    publisher = current_app.extensions.get('order_publisher')
+    if publisher is None:
+        with _publisher_lock:
+            publisher = current_app.extensions.get('order_publisher')
+            if publisher is None:
+                publisher = OrderPublisher(current_app.config)
+                current_app.extensions['order_publisher'] = publisher
+    return publisher
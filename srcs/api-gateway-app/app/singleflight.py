@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+from flask import current_app
+
+_flight_lock = threading.Lock()
+
+
+class _Call:
+    """One in-flight upstream call and the outcome its waiters will share"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one call whose result every caller shares"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, timeout):
+        """Run fn() once per key at a time; waiters give up after timeout seconds and call fn() themselves"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            return fn()
+
+        with self._lock:
+            self.shared += 1
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'shared': self.shared,
+                'timeouts': self.timeouts
+            }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop"""
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    async def do(self, key, fn, timeout):
+        """Await fn() once per key at a time; waiters give up after timeout seconds and await fn() themselves"""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._calls[key] = future
+            self.leaders += 1
+            try:
+                result = await fn()
+            except Exception as e:
+                future.set_exception(e)
+                # Mark it retrieved so an unshared failure is not reported as never retrieved
+                future.exception()
+                raise
+            except BaseException:
+                future.cancel()
+                raise
+            finally:
+                del self._calls[key]
+            future.set_result(result)
+            return result
+
+        # asyncio.wait neither cancels the shared future nor raises on timeout
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        if not done or future.cancelled():
+            self.timeouts += 1
+            return await fn()
+
+        self.shared += 1
+        return future.result()
+
+    def stats(self):
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'shared': self.shared,
+            'timeouts': self.timeouts
+        }
+
+
+def get_single_flight():
+    """Return this worker's request coalescer, creating it on first use"""
+    flight = current_app.extensions.get('single_flight')
+    if flight is None:
+        with _flight_lock:
+            flight = current_app.extensions.get('single_flight')
+            if flight is None:
+                flight = SingleFlight()
+                current_app.extensions['single_flight'] = flight
+    return flight
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from flask import current_app
+
+_hints_lock = threading.Lock()
+
+
+class StockHints:
+    """Last stock level inventory reported per movie, trusted only for a short TTL.
+
+    A hint can only turn an order away early; anything it would let through still
+    goes to inventory's conditional UPDATE, which stays the single source of truth.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._hints = {}
+        self._lock = threading.Lock()
+        self.rejections = 0
+        self.passes = 0
+
+    def observe(self, movie_id, stock):
+        """Remember the stock inventory just reported for a movie"""
+        if not isinstance(stock, int) or isinstance(stock, bool):
+            return
+        with self._lock:
+            if movie_id not in self._hints and len(self._hints) >= self.max_entries:
+                self._hints.pop(next(iter(self._hints)))
+            self._hints[movie_id] = (stock, time.monotonic())
+
+    def forget(self, movie_id=None):
+        """Drop the hint for one movie, or every hint when stock changed in bulk"""
+        with self._lock:
+            if movie_id is None:
+                self._hints.clear()
+            else:
+                self._hints.pop(movie_id, None)
+
+    def available(self, movie_id, quantity):
+        """Hinted stock when a fresh hint says quantity cannot be met, otherwise None"""
+        if not isinstance(quantity, int):
+            return None
+        with self._lock:
+            hint = self._hints.get(movie_id)
+            if hint is None:
+                return None
+            stock, stored_at = hint
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._hints[movie_id]
+                return None
+            if stock >= quantity:
+                self.passes += 1
+                return None
+            self.rejections += 1
+            return stock
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._hints),
+                'rejections': self.rejections,
+                'passes': self.passes
+            }
+
+
+def build_stock_hints(config):
+    return StockHints(
+        ttl=float(config['STOCK_HINT_TTL']),
+        max_entries=int(config['STOCK_HINT_MAX_ENTRIES'])
+    )
+
+
+def get_stock_hints():
+    """Return this worker's stock hints, creating them on first use"""
+    hints = current_app.extensions.get('stock_hints')
+    if hints is None:
+        with _hints_lock:
+            hints = current_app.extensions.get('stock_hints')
+            if hints is None:
+                hints = build_stock_hints(current_app.config)
+                current_app.extensions['stock_hints'] = hints
+    return hints
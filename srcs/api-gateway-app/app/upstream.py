@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+from app.access_log import record_upstream_time
+from app.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+_clients_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised when calls to an upstream are short-circuited"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    # allow() result for the single half-open probe; truthy like a normal admission
+    PROBE = 'probe'
+
+    def allow(self):
+        """Return True (or PROBE) if a call may go through right now, False if it is short-circuited"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # Let exactly one request probe the upstream
+            self.probing = True
+            return self.PROBE
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def abandon_probe(self):
+        """A probe that ended without an upstream answer counts as failed, so another one can follow later"""
+        with self._lock:
+            probing = self.probing
+        if probing:
+            self.record_failure()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.probing:
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+class UpstreamClient:
+    """Keep-alive HTTP client for one upstream service, guarded by a circuit breaker"""
+
+    def __init__(self, name, base_url, pool_size, connect_timeout, read_timeout,
+                 failure_threshold, reset_timeout):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, **kwargs):
+        """Send a request to the upstream; raises CircuitOpenError when short-circuited"""
+        admitted = self.breaker.allow()
+        if not admitted:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        status_code = None
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            status_code = response.status_code
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Any other error must not leave the breaker half-open forever
+            if admitted == CircuitBreaker.PROBE:
+                self.breaker.abandon_probe()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            record_upstream_time(elapsed)
+            observe_upstream(self.name, method, status_code, elapsed)
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+
+def _build_clients(config):
+    connect_timeout = float(config['UPSTREAM_CONNECT_TIMEOUT'])
+    read_timeout = float(config['UPSTREAM_READ_TIMEOUT'])
+    failure_threshold = int(config['CIRCUIT_FAILURE_THRESHOLD'])
+    reset_timeout = float(config['CIRCUIT_RESET_TIMEOUT'])
+
+    return {
+        'inventory': UpstreamClient(
+            'inventory', config['INVENTORY_SERVICE_URL'], int(config['INVENTORY_POOL_SIZE']),
+            connect_timeout, read_timeout, failure_threshold, reset_timeout
+        ),
+        'billing': UpstreamClient(
+            'billing', config['BILLING_SERVICE_URL'], int(config['BILLING_POOL_SIZE']),
+            connect_timeout, read_timeout, failure_threshold, reset_timeout
+        ),
+    }
+
+
+def get_upstream(name):
+    """Return this worker's client for the named upstream, creating clients on first use"""
+    clients = current_app.extensions.get('upstreams')
+    if clients is None:
+        with _clients_lock:
+            clients = current_app.extensions.get('upstreams')
+            if clients is None:
+                clients = _build_clients(current_app.config)
+                current_app.extensions['upstreams'] = clients
+    return clients[name]
+
+
+def inventory_service():
+    return get_upstream('inventory')
+
+
+def billing_service():
+    return get_upstream('billing')
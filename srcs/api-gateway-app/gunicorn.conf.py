@@ -0,0 +1,34 @@
+import multiprocessing
+import os
+import shutil
+
+# Pre-fork serving: WEB_WORKERS processes, each with its own upstream pools, cache,
+# publisher and log writer. The sync engine runs WEB_THREADS threads per worker;
+# GATEWAY_ENGINE=async runs one event loop per worker instead.
+bind = f"0.0.0.0:{os.getenv('APP_PORT', '3000')}"
+workers = int(os.getenv('WEB_WORKERS', str(multiprocessing.cpu_count())))
+timeout = int(os.getenv('WEB_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+if os.getenv('GATEWAY_ENGINE', 'sync') == 'async':
+    wsgi_app = 'app.async_gateway:create_async_app()'
+    worker_class = 'aiohttp.GunicornWebWorker'
+else:
+    wsgi_app = 'server:app'
+    worker_class = 'gthread'
+    threads = int(os.getenv('WEB_THREADS', '8'))
+
+# Workers write their metrics to files here and /metrics merges them (see app/metrics.py)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
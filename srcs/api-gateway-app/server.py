@@ -1,18 +1,25 @@
-import os
-from flask import jsonify
-from app import create_app
-
-app = create_app()
-
-# --- Добавляем приветственный маршрут ---
-@app.route("/")
-def home():
-    return jsonify({
-        "message": "Welcome to Play with Containers API Gateway 🚀",
-        "status": "running",
-        "endpoints": ["/health", "/inventory", "/billing"]
-    })
-
-if __name__ == '__main__':
-    port = int(os.getenv('APP_PORT', 3000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+import os
+from flask import jsonify
+from app import create_app
+
+app = create_app()
+
+# --- Добавляем приветственный маршрут ---
+@app.route("/")
+def home():
+    return jsonify({
+        "message": "Welcome to Play with Containers API Gateway 🚀",
+        "status": "running",
+        "endpoints": ["/health", "/inventory", "/billing"]
+    })
+
+if __name__ == '__main__':
+    port = int(os.getenv('APP_PORT', 3000))
+    
+    if os.getenv('GATEWAY_ENGINE', 'sync') == 'async':
+        # Same routes and responses, served from a single asyncio event loop
+        from aiohttp import web
+        from app.async_gateway import create_async_app
+        web.run_app(create_async_app(), host='0.0.0.0', port=port)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=False)
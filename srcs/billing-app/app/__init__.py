@@ -1,20 +1,33 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
-
-def create_app():
-    app = Flask(__name__)
-    
-    # Load configuration
-    from app.config import Config
-    app.config.from_object(Config)
-    
-    # Initialize database
-    db.init_app(app)
-    
-    # Register routes
-    from app.routes import orders_bp
-    app.register_blueprint(orders_bp, url_prefix='/api')
-    
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from app.database import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def create_app():
+    app = Flask(__name__)
+    
+    # Load configuration
+    from app.config import Config
+    app.config.from_object(Config)
+    
+    # Initialize database (pool options and the optional replica bind first)
+    from app.database import configure_engines
+    configure_engines(app)
+    db.init_app(app)
+    
+    # Prometheus metrics at /metrics
+    from app.metrics import init_metrics
+    init_metrics(app, db)
+    
+    # Register routes
+    from app.routes import orders_bp
+    app.register_blueprint(orders_bp, url_prefix='/api')
+    
+    from app.admin import admin_bp
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    
+    from app.stats import stats_bp
+    app.register_blueprint(stats_bp, url_prefix='/api/stats')
+    
     return app
\ No newline at end of file
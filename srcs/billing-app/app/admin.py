@@ -0,0 +1,121 @@
+import hmac
+import json
+import logging
+import pika
+from pika.exceptions import AMQPError
+from flask import Blueprint, jsonify, request, current_app
+from app.messaging import connection_parameters, declare_topology
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+MAX_BATCH = 500
+
+@admin_bp.before_request
+def require_admin_token():
+    """Admin routes share the public port, so they are off without ADMIN_TOKEN and need it when on"""
+    token = current_app.config['ADMIN_TOKEN']
+    if not token:
+        return jsonify({'error': 'Not found'}), 404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+def describe_message(properties, body):
+    """Summarize a dead-lettered message for the admin API"""
+    headers = properties.headers or {}
+    try:
+        order = json.loads(body)
+    except ValueError:
+        order = body.decode('utf-8', errors='replace')
+    return {
+        'order': order,
+        'attempts': headers.get('x-attempts', 0),
+        'last_error': headers.get('x-last-error'),
+        'dead_lettered_at': headers.get('x-dead-lettered-at')
+    }
+
+@admin_bp.route('/dead-letters', methods=['GET'])
+def get_dead_letters():
+    """Peek at dead-lettered orders without removing them.
+
+    RabbitMQ has no read-only peek: the messages are fetched and requeued, which marks
+    them redelivered and can move them behind the rest of the queue.
+    """
+    limit = request.args.get('limit', 50, type=int)
+    if limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_BATCH)
+    try:
+        connection = pika.BlockingConnection(connection_parameters(current_app.config))
+    except (AMQPError, OSError) as e:
+        logger.error(f"Error connecting to broker: {str(e)}")
+        return jsonify({'error': 'Message broker unavailable'}), 503
+
+    try:
+        channel = connection.channel()
+        declared = declare_topology(channel, current_app.config)
+        dead_letter_queue = declared.method.queue
+
+        messages = []
+        for _ in range(limit):
+            method, properties, body = channel.basic_get(dead_letter_queue, auto_ack=False)
+            if method is None:
+                break
+            messages.append(describe_message(properties, body))
+    finally:
+        # Closing without acking puts the peeked messages back on the queue
+        connection.close()
+
+    return jsonify({
+        'total': declared.method.message_count,
+        'messages': messages
+    }), 200
+
+@admin_bp.route('/dead-letters/replay', methods=['POST'])
+def replay_dead_letters():
+    """Move dead-lettered orders back onto the work queue with a fresh attempt count"""
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+
+    limit = data.get('limit', MAX_BATCH)
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_BATCH)
+
+    try:
+        connection = pika.BlockingConnection(connection_parameters(current_app.config))
+    except (AMQPError, OSError) as e:
+        logger.error(f"Error connecting to broker: {str(e)}")
+        return jsonify({'error': 'Message broker unavailable'}), 503
+
+    replayed = 0
+    try:
+        channel = connection.channel()
+        channel.confirm_delivery()
+        dead_letter_queue = declare_topology(channel, current_app.config).method.queue
+
+        for _ in range(limit):
+            method, properties, body = channel.basic_get(dead_letter_queue, auto_ack=False)
+            if method is None:
+                break
+            channel.basic_publish(
+                exchange='',
+                routing_key=current_app.config['RABBITMQ_QUEUE'],
+                body=body,
+                properties=pika.BasicProperties(
+                    delivery_mode=2,  # Make message persistent
+                    content_type=properties.content_type
+                )
+            )
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+            replayed += 1
+    finally:
+        connection.close()
+
+    logger.info(f"Replayed {replayed} dead-lettered orders")
+    return jsonify({'replayed': replayed}), 200
@@ -0,0 +1,48 @@
+from datetime import timezone
+from flask import Response, jsonify, request
+from sqlalchemy import func, select
+from app import db
+from app.serialization import json_body, model_encoder
+
+# Validators are derived from id/updated_at (and row counts for lists), so checking them
+# never needs the full rows. Every write bumps updated_at through the column's onupdate.
+def _stamp(value):
+    return '0' if value is None else value.strftime('%Y%m%d%H%M%S%f')
+
+def collection_validators(stmt):
+    """ETag and Last-Modified for the rows stmt selects, from one aggregate query over them"""
+    rows = stmt.subquery()
+    count, last_id, last_modified = db.session.execute(
+        select(func.count(), func.max(rows.c.id), func.max(rows.c.updated_at))
+    ).one()
+    return f"{count}-{last_id or 0}-{_stamp(last_modified)}", last_modified
+
+def not_modified(etag, last_modified=None):
+    """True when the client's If-None-Match (or If-Modified-Since, if given last_modified) still holds"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+    return False
+
+def with_validators(response, etag, last_modified):
+    """Attach a weak ETag and Last-Modified to a response"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return response
+
+def not_modified_response(etag, last_modified):
+    return with_validators(Response(status=304), etag, last_modified), 304
+
+def item_response(model, not_found, *criteria):
+    """Answer a single-row read, or 304 without encoding the row when the client's copy is current"""
+    columns, encode = model_encoder(model)
+    row = db.session.execute(db.select(*columns).where(*criteria)).first()
+    if row is None:
+        return jsonify({'error': not_found}), 404
+
+    etag = f"{row.id}-{_stamp(row.updated_at)}"
+    if not_modified(etag, row.updated_at):
+        return not_modified_response(etag, row.updated_at)
+    return with_validators(json_body(encode(row) + '\n'), etag, row.updated_at), 200
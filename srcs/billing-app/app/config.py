@@ -1,18 +1,73 @@
-import os
-
-class Config:
-    DB_HOST = os.getenv('DB_HOST', 'localhost')
-    DB_PORT = os.getenv('DB_PORT', '5432')
-    DB_NAME = os.getenv('DB_NAME', 'billing_db')
-    DB_USER = os.getenv('DB_USER', 'postgres')
-    DB_PASSWORD = os.getenv('DB_PASSWORD', 'postgres')
-    
-    SQLALCHEMY_DATABASE_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
-    # RabbitMQ Configuration
-    RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'rabbit-queue')
-    RABBITMQ_PORT = os.getenv('RABBITMQ_PORT', '5672')
-    RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'admin')
-    RABBITMQ_PASSWORD = os.getenv('RABBITMQ_PASSWORD', 'admin')
-    RABBITMQ_QUEUE = os.getenv('RABBITMQ_QUEUE', 'payment_queue')
\ No newline at end of file
+import os
+
+class Config:
+    DB_HOST = os.getenv('DB_HOST', 'localhost')
+    DB_PORT = os.getenv('DB_PORT', '5432')
+    DB_NAME = os.getenv('DB_NAME', 'billing_db')
+    DB_USER = os.getenv('DB_USER', 'postgres')
+    DB_PASSWORD = os.getenv('DB_PASSWORD', 'postgres')
+    
+    # DATABASE_URL overrides the DB_* settings (e.g. sqlite:///... for local benchmarks)
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        'DATABASE_URL',
+        f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Optional streaming read replica: DATABASE_REPLICA_URL, or DB_REPLICA_HOST with the
+    # DB_* credentials. Read-only routes (@replica_reads) use it; writes stay on the primary.
+    DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST', '')
+    SQLALCHEMY_REPLICA_URI = os.getenv(
+        'DATABASE_REPLICA_URL',
+        f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_REPLICA_HOST}:{DB_PORT}/{DB_NAME}" if DB_REPLICA_HOST else ''
+    )
+    
+    # Connection pool per worker process and engine (see app.database). A worker opens at most
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections; DB_STATEMENT_TIMEOUT_MS=0 disables the timeout.
+    DB_POOL_SIZE = os.getenv('DB_POOL_SIZE', '5')
+    DB_MAX_OVERFLOW = os.getenv('DB_MAX_OVERFLOW', '10')
+    DB_POOL_TIMEOUT = os.getenv('DB_POOL_TIMEOUT', '30')
+    DB_POOL_RECYCLE = os.getenv('DB_POOL_RECYCLE', '1800')
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true')
+    DB_STATEMENT_TIMEOUT_MS = os.getenv('DB_STATEMENT_TIMEOUT_MS', '0')
+    
+    # List endpoints: largest page for ?limit= and rows fetched per batch when streaming
+    MAX_PAGE_SIZE = os.getenv('MAX_PAGE_SIZE', '1000')
+    STREAM_BATCH_SIZE = os.getenv('STREAM_BATCH_SIZE', '500')
+    
+    # PUT /orders/status: most status changes accepted in one request (applied as one UPDATE)
+    MAX_STATUS_UPDATES = os.getenv('MAX_STATUS_UPDATES', '10000')
+    
+    # GET /orders/user/<id> without ?from= returns this many days of history
+    USER_ORDERS_DEFAULT_DAYS = os.getenv('USER_ORDERS_DEFAULT_DAYS', '365')
+    
+    # Monthly orders partitions (python -m app.partitions): months created ahead, seconds
+    # between "maintain" runs, months kept attached before archival, and where archived
+    # months are written as .csv.gz
+    ORDERS_PARTITIONS_AHEAD = os.getenv('ORDERS_PARTITIONS_AHEAD', '3')
+    ORDERS_PARTITION_CHECK_INTERVAL = os.getenv('ORDERS_PARTITION_CHECK_INTERVAL', '3600')
+    ORDERS_RETENTION_MONTHS = os.getenv('ORDERS_RETENTION_MONTHS', '24')
+    ORDERS_ARCHIVE_DIR = os.getenv('ORDERS_ARCHIVE_DIR', '/var/lib/billing/archive')
+    
+    # RabbitMQ Configuration
+    RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'rabbit-queue')
+    RABBITMQ_PORT = os.getenv('RABBITMQ_PORT', '5672')
+    RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'admin')
+    RABBITMQ_PASSWORD = os.getenv('RABBITMQ_PASSWORD', 'admin')
+    RABBITMQ_QUEUE = os.getenv('RABBITMQ_QUEUE', 'payment_queue')
+    
+    # Consumer batching: store up to BATCH_SIZE orders per transaction, waiting
+    # at most BATCH_TIMEOUT_MS for a batch to fill
+    CONSUMER_PREFETCH = os.getenv('CONSUMER_PREFETCH', '200')
+    CONSUMER_BATCH_SIZE = os.getenv('CONSUMER_BATCH_SIZE', '100')
+    CONSUMER_BATCH_TIMEOUT_MS = os.getenv('CONSUMER_BATCH_TIMEOUT_MS', '200')
+    
+    # Standalone consumer (python consumer.py): processes to run and the port serving their metrics
+    CONSUMER_PROCESSES = os.getenv('CONSUMER_PROCESSES', '1')
+    CONSUMER_METRICS_PORT = os.getenv('CONSUMER_METRICS_PORT', '9100')
+    
+    # Failed orders are retried after each of these delays, then dead-lettered
+    RETRY_DELAYS_MS = os.getenv('RETRY_DELAYS_MS', '1000,10000,60000,300000')
+    
+    # /api/admin/* needs "Authorization: Bearer <ADMIN_TOKEN>"; empty turns the admin routes off
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
\ No newline at end of file
@@ -1,79 +1,191 @@
-import pika
-import json
-import logging
-from app import db, create_app
-from app.models import Order
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-def process_order(ch, method, properties, body):
-    """Process order message from RabbitMQ queue"""
-    try:
-        data = json.loads(body)
-        logger.info(f"Received order: {data}")
-        
-        # Create Flask app context
-        app = create_app()
-        with app.app_context():
-            # Create new order
-            order = Order(
-                user_id=data['user_id'],
-                movie_id=data['movie_id'],
-                movie_title=data['movie_title'],
-                quantity=data['quantity'],
-                price=data['price'],
-                total_amount=data['total_amount'],
-                status='processing'
-            )
-            
-            db.session.add(order)
-            db.session.commit()
-            
-            logger.info(f"Order {order.id} created successfully")
-            
-            # Acknowledge message
-            ch.basic_ack(delivery_tag=method.delivery_tag)
-            
-    except Exception as e:
-        logger.error(f"Error processing order: {str(e)}")
-        # Reject message and requeue
-        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-
-def start_consumer():
-    """Start RabbitMQ consumer"""
-    from app.config import Config
-    
-    # Build RabbitMQ connection URL
-    credentials = pika.PlainCredentials(Config.RABBITMQ_USER, Config.RABBITMQ_PASSWORD)
-    parameters = pika.ConnectionParameters(
-        host=Config.RABBITMQ_HOST,
-        port=int(Config.RABBITMQ_PORT),
-        credentials=credentials,
-        heartbeat=600,
-        blocked_connection_timeout=300
-    )
-    
-    try:
-        # Connect to RabbitMQ
-        connection = pika.BlockingConnection(parameters)
-        channel = connection.channel()
-        
-        # Declare queue
-        channel.queue_declare(queue=Config.RABBITMQ_QUEUE, durable=True)
-        
-        # Set QoS
-        channel.basic_qos(prefetch_count=1)
-        
-        # Start consuming
-        channel.basic_consume(
-            queue=Config.RABBITMQ_QUEUE,
-            on_message_callback=process_order
-        )
-        
-        logger.info(f"Started consuming from queue: {Config.RABBITMQ_QUEUE}")
-        channel.start_consuming()
-        
-    except Exception as e:
-        logger.error(f"Error starting consumer: {str(e)}")
-        raise
\ No newline at end of file
+import pika
+import json
+import logging
+import time
+from datetime import datetime
+from sqlalchemy import insert
+from app import db, create_app
+from app.models import Order
+from app.messaging import (
+    attempts_of, connection_parameters, dead_letter_queue_name, declare_topology, schedule_retry
+)
+from app.metrics import (
+    CONSUMER_BATCH_DURATION, CONSUMER_BATCH_SIZE, ORDERS_STORED, QUEUE_DEPTH, REDELIVERIES, RETRIES
+)
+from app.stats import record_sales
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds between queue depth samples for the billing_queue_depth gauge
+QUEUE_DEPTH_INTERVAL = 5
+
+def parse_order(body):
+    """Turn a queued order message into an orders row"""
+    data = json.loads(body)
+    return {
+        'user_id': data['user_id'],
+        'movie_id': data['movie_id'],
+        'movie_title': data['movie_title'],
+        'quantity': data['quantity'],
+        'price': data['price'],
+        'total_amount': data['total_amount'],
+        'status': 'processing',
+        'created_at': datetime.utcnow()
+    }
+
+class BatchConsumer:
+    """Collects deliveries and stores them with one multi-row insert per batch"""
+
+    def __init__(self, config, connection, channel, batch_size, batch_timeout):
+        self.config = config
+        self.connection = connection
+        self.channel = channel
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.pending = []
+        self.deadline = None
+        self.next_depth_sample = 0.0
+
+    def on_message(self, ch, method, properties, body):
+        """Buffer a delivery until the batch is full or times out"""
+        if not self.pending:
+            self.deadline = time.monotonic() + self.batch_timeout
+        if method.redelivered:
+            REDELIVERIES.labels('broker').inc()
+        if attempts_of(properties):
+            REDELIVERIES.labels('retry').inc()
+        self.pending.append((method.delivery_tag, properties, body))
+
+    def run(self):
+        """Pump the connection and flush batches by size or age"""
+        while True:
+            if self.pending:
+                time_limit = max(0.0, self.deadline - time.monotonic())
+            else:
+                time_limit = self.batch_timeout
+            self.connection.process_data_events(time_limit=time_limit)
+
+            if self.pending and (len(self.pending) >= self.batch_size
+                                 or time.monotonic() >= self.deadline):
+                while self.pending:
+                    batch = self.pending[:self.batch_size]
+                    self.pending = self.pending[self.batch_size:]
+                    started = time.perf_counter()
+                    self.process_batch(batch)
+                    CONSUMER_BATCH_DURATION.observe(time.perf_counter() - started)
+
+            if time.monotonic() >= self.next_depth_sample:
+                self.sample_queue_depth()
+
+    def sample_queue_depth(self):
+        """Record how many messages are waiting in the work and dead-letter queues"""
+        queue = self.config['RABBITMQ_QUEUE']
+        for name in (queue, dead_letter_queue_name(queue)):
+            declared = self.channel.queue_declare(queue=name, passive=True)
+            QUEUE_DEPTH.labels(name).set(declared.method.message_count)
+        self.next_depth_sample = time.monotonic() + QUEUE_DEPTH_INTERVAL
+
+    def process_batch(self, batch):
+        """Insert a batch of orders and their rollup updates in one transaction, then multi-ack it"""
+        rows = []
+        stored = []
+        for delivery in batch:
+            try:
+                rows.append(parse_order(delivery[2]))
+                stored.append(delivery)
+            except (ValueError, KeyError, TypeError) as e:
+                # A malformed payload will never succeed, so skip the retries
+                logger.error(f"Error processing order: {str(e)}")
+                self.retry(delivery, e, permanent=True)
+
+        if not rows:
+            return
+
+        try:
+            db.session.execute(insert(Order), rows)
+            record_sales(rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error storing batch of {len(rows)} orders: {str(e)}")
+            self.process_individually(stored, rows)
+            return
+
+        # Acknowledge every delivery up to and including the last one
+        self.channel.basic_ack(delivery_tag=stored[-1][0], multiple=True)
+        CONSUMER_BATCH_SIZE.observe(len(rows))
+        ORDERS_STORED.inc(len(rows))
+        logger.info(f"Stored batch of {len(rows)} orders")
+
+    def process_individually(self, deliveries, rows):
+        """Retry a failed batch row by row so one bad order cannot hold back the rest"""
+        for delivery, row in zip(deliveries, rows):
+            try:
+                db.session.execute(insert(Order), [row])
+                record_sales([row])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error storing order: {str(e)}")
+                self.retry(delivery, e)
+                continue
+            self.channel.basic_ack(delivery_tag=delivery[0])
+            ORDERS_STORED.inc()
+
+    def retry(self, delivery, error, permanent=False):
+        """Hand a failed delivery to the delay/dead-letter queues instead of requeueing it hot"""
+        delivery_tag, properties, body = delivery
+        target = schedule_retry(self.channel, self.config, body, properties, error, permanent)
+        self.channel.basic_ack(delivery_tag=delivery_tag)
+        RETRIES.labels(target).inc()
+        logger.warning(f"Order message moved to {target}")
+
+def start_consumer():
+    """Start RabbitMQ consumer"""
+    from app.config import Config
+
+    # One app context for the consumer's lifetime instead of one per message
+    app = create_app()
+
+    parameters = connection_parameters(
+        app.config,
+        heartbeat=600,
+        blocked_connection_timeout=300
+    )
+
+    try:
+        # Connect to RabbitMQ
+        connection = pika.BlockingConnection(parameters)
+        channel = connection.channel()
+
+        # Confirm republished retries before acking the original delivery
+        channel.confirm_delivery()
+
+        # Declare work, delay and dead-letter queues
+        declare_topology(channel, app.config)
+
+        # Set QoS
+        channel.basic_qos(prefetch_count=int(Config.CONSUMER_PREFETCH))
+
+        consumer = BatchConsumer(
+            app.config,
+            connection,
+            channel,
+            batch_size=int(Config.CONSUMER_BATCH_SIZE),
+            batch_timeout=int(Config.CONSUMER_BATCH_TIMEOUT_MS) / 1000
+        )
+
+        # Start consuming
+        channel.basic_consume(
+            queue=Config.RABBITMQ_QUEUE,
+            on_message_callback=consumer.on_message
+        )
+
+        logger.info(f"Started consuming from queue: {Config.RABBITMQ_QUEUE}")
+        with app.app_context():
+            consumer.run()
+
+    except Exception as e:
+        logger.error(f"Error starting consumer: {str(e)}")
+        raise
@@ -0,0 +1,51 @@
+from functools import wraps
+from flask import g
+from flask_sqlalchemy.session import Session
+
+def engine_options(config, url):
+    """SQLAlchemy engine/pool options for one database URL from the DB_POOL_* settings"""
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'].lower() == 'true',
+        'pool_recycle': int(config['DB_POOL_RECYCLE'])
+    }
+    if url.startswith('sqlite'):
+        # Local SQLite databases keep SQLAlchemy's default pool
+        return options
+
+    options.update({
+        'pool_size': int(config['DB_POOL_SIZE']),
+        'max_overflow': int(config['DB_MAX_OVERFLOW']),
+        'pool_timeout': int(config['DB_POOL_TIMEOUT'])
+    })
+    statement_timeout = int(config['DB_STATEMENT_TIMEOUT_MS'])
+    if statement_timeout > 0:
+        options['connect_args'] = {'options': f"-c statement_timeout={statement_timeout}"}
+    return options
+
+def configure_engines(app):
+    """Set SQLALCHEMY_ENGINE_OPTIONS, and a 'replica' bind when a replica URL is configured"""
+    config = app.config
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config, config['SQLALCHEMY_DATABASE_URI'])
+
+    replica_url = config['SQLALCHEMY_REPLICA_URI']
+    if replica_url:
+        # Binds given as dicts do not inherit SQLALCHEMY_ENGINE_OPTIONS
+        config['SQLALCHEMY_BINDS'] = {'replica': {'url': replica_url, **engine_options(config, replica_url)}}
+
+class RoutingSession(Session):
+    """Session that sends the queries of @replica_reads views to the 'replica' bind, if there is one"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and g.get('replica_reads'):
+            replica = self._db.engines.get('replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def replica_reads(view):
+    """Run a read-only view against the replica; writes and everything outside such views use the primary"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
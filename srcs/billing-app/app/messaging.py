@@ -0,0 +1,74 @@
+import pika
+from datetime import datetime
+
+def connection_parameters(config, **kwargs):
+    """Build RabbitMQ connection parameters from the app config"""
+    credentials = pika.PlainCredentials(config['RABBITMQ_USER'], config['RABBITMQ_PASSWORD'])
+    return pika.ConnectionParameters(
+        host=config['RABBITMQ_HOST'],
+        port=int(config['RABBITMQ_PORT']),
+        credentials=credentials,
+        **kwargs
+    )
+
+def retry_delays(config):
+    """Backoff delays in milliseconds, one per retry attempt"""
+    return [int(delay) for delay in config['RETRY_DELAYS_MS'].split(',') if delay.strip()]
+
+def retry_queue_name(queue, delay_ms):
+    return f"{queue}.retry.{delay_ms}ms"
+
+def dead_letter_queue_name(queue):
+    return f"{queue}.dead"
+
+def declare_topology(channel, config):
+    """Declare the work queue, its delay queues and its dead-letter queue"""
+    queue = config['RABBITMQ_QUEUE']
+    channel.queue_declare(queue=queue, durable=True)
+
+    # Messages wait out their TTL in a delay queue, then the broker
+    # dead-letters them straight back onto the work queue
+    for delay in retry_delays(config):
+        channel.queue_declare(
+            queue=retry_queue_name(queue, delay),
+            durable=True,
+            arguments={
+                'x-message-ttl': delay,
+                'x-dead-letter-exchange': '',
+                'x-dead-letter-routing-key': queue
+            }
+        )
+
+    return channel.queue_declare(queue=dead_letter_queue_name(queue), durable=True)
+
+def attempts_of(properties):
+    """Number of failed processing attempts recorded on a message"""
+    return int((properties.headers or {}).get('x-attempts', 0))
+
+def schedule_retry(channel, config, body, properties, error, permanent=False):
+    """Send a failed message to its next delay queue, or dead-letter it once retries run out"""
+    queue = config['RABBITMQ_QUEUE']
+    delays = retry_delays(config)
+    attempts = attempts_of(properties) + 1
+
+    headers = dict(properties.headers or {})
+    headers['x-attempts'] = attempts
+    headers['x-last-error'] = str(error)[:500]
+
+    if permanent or attempts > len(delays):
+        target = dead_letter_queue_name(queue)
+        headers['x-dead-lettered-at'] = datetime.utcnow().isoformat()
+    else:
+        target = retry_queue_name(queue, delays[attempts - 1])
+
+    channel.basic_publish(
+        exchange='',
+        routing_key=target,
+        body=body,
+        properties=pika.BasicProperties(
+            delivery_mode=2,  # Make message persistent
+            content_type=properties.content_type,
+            headers=headers
+        )
+    )
+    return target
@@ -0,0 +1,99 @@
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+# Routes are labelled by their template (/api/orders/<int:order_id>), never the raw path,
+# so label cardinality stays fixed however many ids are requested
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by route template',
+    ['method', 'route', 'status']
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled',
+    ['route'], multiprocess_mode='livesum'
+)
+DB_POOL_OPEN = Gauge(
+    'db_pool_connections_open', 'Database connections held by the pool',
+    multiprocess_mode='livesum'
+)
+DB_POOL_IN_USE = Gauge(
+    'db_pool_connections_in_use', 'Pooled database connections checked out',
+    multiprocess_mode='livesum'
+)
+
+
+# Order consumer
+CONSUMER_BATCH_DURATION = Histogram(
+    'billing_consumer_batch_duration_seconds', 'Time to store and acknowledge one batch of orders'
+)
+CONSUMER_BATCH_SIZE = Histogram(
+    'billing_consumer_batch_size', 'Orders per stored batch',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+ORDERS_STORED = Counter('billing_orders_stored_total', 'Orders written to the database')
+REDELIVERIES = Counter(
+    'billing_consumer_redeliveries_total',
+    'Deliveries seen before: requeued by the broker or back from a delay queue',
+    ['cause']
+)
+RETRIES = Counter(
+    'billing_consumer_retries_total', 'Failed orders moved to a delay or dead-letter queue', ['queue']
+)
+QUEUE_DEPTH = Gauge(
+    'billing_queue_depth', 'Messages ready in a RabbitMQ queue, sampled by the consumer',
+    ['queue'], multiprocess_mode='max'
+)
+
+
+def render_metrics():
+    """Metrics in Prometheus text format, merged across worker processes in multiprocess mode"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def track_pool(engine):
+    """Keep the pool gauges current from SQLAlchemy pool events"""
+    event.listen(engine, 'connect', lambda *args: DB_POOL_OPEN.inc())
+    event.listen(engine, 'close', lambda *args: DB_POOL_OPEN.dec())
+    event.listen(engine, 'close_detached', lambda *args: DB_POOL_OPEN.dec())
+    event.listen(engine, 'checkout', lambda *args: DB_POOL_IN_USE.inc())
+    event.listen(engine, 'checkin', lambda *args: DB_POOL_IN_USE.dec())
+
+
+def init_metrics(app, db):
+    """Record per-route latency, in-flight requests and pool usage, and serve them at /metrics"""
+    with app.app_context():
+        for engine in db.engines.values():
+            track_pool(engine)
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(g.metrics_route).inc()
+
+    @app.after_request
+    def observe_request(response):
+        if 'metrics_start' in g:
+            REQUEST_LATENCY.labels(request.method, g.metrics_route, str(response.status_code)).observe(
+                time.perf_counter() - g.metrics_start
+            )
+        return response
+
+    @app.teardown_request
+    def finish_metrics(exc):
+        if 'metrics_route' in g:
+            REQUESTS_IN_FLIGHT.labels(g.metrics_route).dec()
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), headers={'Content-Type': CONTENT_TYPE_LATEST})
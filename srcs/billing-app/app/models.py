@@ -1,30 +1,82 @@
-from app import db
-from datetime import datetime
-
-class Order(db.Model):
-    __tablename__ = 'orders'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=False)
-    movie_id = db.Column(db.Integer, nullable=False)
-    movie_title = db.Column(db.String(255), nullable=False)
-    quantity = db.Column(db.Integer, nullable=False, default=1)
-    price = db.Column(db.Numeric(10, 2), nullable=False)
-    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
-    status = db.Column(db.String(50), default='pending')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'movie_id': self.movie_id,
-            'movie_title': self.movie_title,
-            'quantity': self.quantity,
-            'price': float(self.price),
-            'total_amount': float(self.total_amount),
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+from app import db
+from datetime import datetime
+
+class Order(db.Model):
+    __tablename__ = 'orders'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    movie_id = db.Column(db.Integer, nullable=False)
+    movie_title = db.Column(db.String(255), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    status = db.Column(db.String(50), default='pending')
+    # Partition key of the monthly orders partitions (billing-db/init.sql)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Columns and JSON types rendered by the ORM-free read path (app.serialization);
+    # must produce the same output as to_dict()
+    json_fields = (
+        ('id', 'int'),
+        ('user_id', 'int'),
+        ('movie_id', 'int'),
+        ('movie_title', 'str'),
+        ('quantity', 'int'),
+        ('price', 'float'),
+        ('total_amount', 'float'),
+        ('status', 'str'),
+        ('created_at', 'datetime'),
+        ('updated_at', 'datetime')
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'movie_id': self.movie_id,
+            'movie_title': self.movie_title,
+            'quantity': self.quantity,
+            'price': float(self.price),
+            'total_amount': float(self.total_amount),
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class MovieSalesStats(db.Model):
+    __tablename__ = 'movie_sales_stats'
+    
+    movie_id = db.Column(db.Integer, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'movie_id': self.movie_id,
+            'order_count': self.order_count,
+            'quantity': self.quantity,
+            'total_amount': float(self.total_amount),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class DailySalesStats(db.Model):
+    __tablename__ = 'daily_sales_stats'
+    
+    day = db.Column(db.Date, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'order_count': self.order_count,
+            'quantity': self.quantity,
+            'total_amount': float(self.total_amount),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
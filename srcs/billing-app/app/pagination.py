@@ -0,0 +1,104 @@
+import json
+from flask import Response, current_app, jsonify, request, stream_with_context
+from app import db
+from app.conditional import collection_validators, not_modified, not_modified_response, with_validators
+from app.serialization import encode_rows, json_body, model_encoder
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson'
+}
+
+def generate_rows(rows, encode, fmt, batch_size):
+    """Yield a JSON array or NDJSON document a batch of rows at a time"""
+    if fmt == 'ndjson':
+        chunk = []
+        for row in rows:
+            chunk.append(encode(row) + '\n')
+            if len(chunk) >= batch_size:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+        return
+
+    yield '['
+    chunk = []
+    first = True
+    for row in rows:
+        chunk.append(encode(row))
+        if len(chunk) >= batch_size:
+            yield ('' if first else ',') + ','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield ('' if first else ',') + ','.join(chunk)
+    yield ']\n'
+
+def list_response(stmt, model):
+    """Answer a list route with optional keyset pagination (?after_id=&limit=) or streaming (?stream=json|ndjson)"""
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
+    fmt = request.args.get('stream')
+
+    if fmt is not None and fmt not in STREAM_FORMATS:
+        return jsonify({'error': 'stream must be json or ndjson'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    # Select plain column tuples; no ORM objects are built for list responses
+    columns, encode = model_encoder(model)
+    stmt = stmt.with_only_columns(*columns)
+
+    if after_id is not None:
+        stmt = stmt.where(model.id > after_id)
+    if fmt is None and limit is not None:
+        limit = min(limit, int(current_app.config['MAX_PAGE_SIZE']))
+    stmt = stmt.order_by(model.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    # Validators cover exactly the rows of this page, so a 304 never reads or encodes them
+    etag, last_modified = collection_validators(stmt if limit is not None else stmt.order_by(None))
+    if not_modified(etag):
+        return not_modified_response(etag, last_modified)
+
+    if fmt is not None:
+        batch_size = int(current_app.config['STREAM_BATCH_SIZE'])
+
+        # yield_per uses a server-side cursor, so memory stays flat however many rows match
+        rows = db.session.execute(stmt.execution_options(yield_per=batch_size))
+        response = Response(
+            stream_with_context(generate_rows(rows, encode, fmt, batch_size)),
+            mimetype=STREAM_FORMATS[fmt]
+        )
+        return with_validators(response, etag, last_modified)
+
+    rows = db.session.execute(stmt).all()
+    response = json_body(encode_rows(rows, encode))
+
+    # A full page means there may be more; tell the client where to resume
+    if limit is not None and len(rows) == limit:
+        response.headers['X-Next-After-Id'] = str(rows[-1].id)
+    return with_validators(response, etag, last_modified), 200
+
+def multi_get_response(model, not_found):
+    """Answer ?ids=1,2,3 with one IN query; results follow request order, misses get an error marker"""
+    try:
+        ids = [int(value) for value in request.args['ids'].split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be comma-separated integers'}), 400
+    if not ids:
+        return jsonify({'error': 'ids must not be empty'}), 400
+    if len(ids) > int(current_app.config['MAX_PAGE_SIZE']):
+        return jsonify({'error': f"At most {current_app.config['MAX_PAGE_SIZE']} ids per request"}), 400
+
+    columns, encode = model_encoder(model)
+    rows = db.session.execute(db.select(*columns).where(model.id.in_(set(ids)))).all()
+    found = {row.id: encode(row) for row in rows}
+
+    items = [
+        found.get(item_id) or json.dumps({'error': not_found, 'id': item_id}, separators=(',', ':'))
+        for item_id in ids
+    ]
+    return json_body('[' + ','.join(items) + ']\n'), 200
@@ -0,0 +1,190 @@
+"""Maintain the monthly partitions of the billing orders table (PostgreSQL only).
+
+    python -m app.partitions ensure     # create partitions for the coming months
+    python -m app.partitions maintain   # run ensure every ORDERS_PARTITION_CHECK_INTERVAL seconds
+    python -m app.partitions archive    # detach old months, write them to .csv.gz, drop them
+
+Compose runs "maintain" as the billing-partitions service; run archive regularly
+(e.g. daily from cron). Rows outside every monthly partition land in orders_default;
+ensure moves them into their month's partition when it creates it.
+"""
+import argparse
+import gzip
+import logging
+import os
+import re
+import time
+from datetime import date, datetime
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app import create_app, db
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r'^orders_y(\d{4})m(\d{2})$')
+
+def add_months(month, count):
+    """First day of the month count months after the month containing the given date"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month):
+    return f"orders_y{month.year:04d}m{month.month:02d}"
+
+def create_partition(name, month):
+    """Create one monthly partition, moving any of its rows out of orders_default; returns the rows moved"""
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+
+    # CREATE ... PARTITION OF fails if orders_default holds rows of the month, so build
+    # the table, move those rows into it and attach it in one transaction. The lock keeps
+    # new rows out of orders_default until the attach has checked it.
+    db.session.execute(text("LOCK TABLE orders_default IN ACCESS EXCLUSIVE MODE"))
+    db.session.execute(text(f"CREATE TABLE {name} (LIKE orders INCLUDING DEFAULTS)"))
+    moved = db.session.execute(text(
+        f"WITH moved AS (DELETE FROM orders_default WHERE created_at >= :start AND created_at < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), {'start': start, 'end': end}).rowcount
+    db.session.execute(text(f"ALTER TABLE orders ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    db.session.commit()
+    return moved
+
+def ensure_partitions(months_ahead):
+    """Create the partitions for this month and months_ahead months after it; returns the new names"""
+    this_month = add_months(datetime.utcnow().date(), 0)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        name = partition_name(month)
+        if db.session.scalar(text("SELECT to_regclass(:name)"), {'name': name}) is not None:
+            continue
+        moved = create_partition(name, month)
+        if moved:
+            logger.warning(f"Moved {moved} orders from orders_default into {name}")
+        created.append(name)
+    db.session.commit()
+    return created
+
+def maintain_partitions(months_ahead, interval):
+    """Run ensure_partitions every interval seconds, surviving database errors between runs"""
+    while True:
+        try:
+            created = ensure_partitions(months_ahead)
+            if created:
+                logger.info(f"Created partitions: {', '.join(created)}")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Error creating partitions: {str(e)}")
+        time.sleep(interval)
+
+def partitions_before(cutoff):
+    """Monthly order tables, attached or already detached, whose rows all predate cutoff"""
+    names = db.session.scalars(text(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND relname ~ '^orders_y[0-9]{4}m[0-9]{2}$' "
+        "ORDER BY relname"
+    ))
+    expired = []
+    for name in names:
+        year, month = PARTITION_NAME.match(name).groups()
+        if add_months(date(int(year), int(month), 1), 1) <= cutoff:
+            expired.append(name)
+    return expired
+
+def archive_partition(name, archive_dir):
+    """Detach one monthly partition, copy it to <archive_dir>/<name>.csv.gz and drop it once the copy is complete"""
+    attached = db.session.scalar(
+        text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:name)"), {'name': name}
+    )
+    if attached:
+        # Metadata-only, but it briefly locks orders; detached months no longer slow the hot path
+        db.session.execute(text(f"ALTER TABLE orders DETACH PARTITION {name}"))
+        db.session.commit()
+
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+    expected = db.session.scalar(text(f"SELECT count(*) FROM {name}"))
+
+    # COPY streams the table straight into the gzip file without materializing rows in Python
+    cursor = db.session.connection().connection.cursor()
+    with gzip.open(partial, 'wt', encoding='utf-8', newline='') as out:
+        cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", out)
+        copied = cursor.rowcount
+    if copied != expected:
+        db.session.rollback()
+        os.remove(partial)
+        raise RuntimeError(f"Archive of {name} has {copied} rows, expected {expected}; table kept")
+
+    with open(partial, 'rb') as written:
+        os.fsync(written.fileno())
+    os.replace(partial, path)
+
+    db.session.execute(text(f"DROP TABLE {name}"))
+    db.session.commit()
+    return path, copied
+
+def archive_partitions(retention_months, archive_dir, dry_run=False):
+    """Archive every month older than the current month minus retention_months"""
+    cutoff = add_months(datetime.utcnow().date(), -retention_months)
+    names = partitions_before(cutoff)
+    if dry_run:
+        return [(name, None, None) for name in names]
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+    for name in names:
+        path, rows = archive_partition(name, archive_dir)
+        logger.info(f"Archived {rows} orders from {name} to {path}")
+        archived.append((name, path, rows))
+    return archived
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ensure = commands.add_parser('ensure', help='create partitions for the coming months')
+    ensure.add_argument('--months-ahead', type=int, help='default: ORDERS_PARTITIONS_AHEAD')
+
+    maintain = commands.add_parser('maintain', help='run ensure periodically until stopped')
+    maintain.add_argument('--months-ahead', type=int, help='default: ORDERS_PARTITIONS_AHEAD')
+    maintain.add_argument('--interval', type=float, help='seconds between runs, default: ORDERS_PARTITION_CHECK_INTERVAL')
+
+    archive = commands.add_parser('archive', help='move months past the retention window to .csv.gz files')
+    archive.add_argument('--retention-months', type=int, help='default: ORDERS_RETENTION_MONTHS')
+    archive.add_argument('--archive-dir', help='default: ORDERS_ARCHIVE_DIR')
+    archive.add_argument('--dry-run', action='store_true', help='only list the months that would be archived')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            parser.error('orders are only partitioned on PostgreSQL')
+
+        if args.command in ('ensure', 'maintain'):
+            months_ahead = args.months_ahead
+            if months_ahead is None:
+                months_ahead = int(app.config['ORDERS_PARTITIONS_AHEAD'])
+
+        if args.command == 'maintain':
+            interval = args.interval
+            if interval is None:
+                interval = float(app.config['ORDERS_PARTITION_CHECK_INTERVAL'])
+            maintain_partitions(months_ahead, interval)
+            return
+
+        if args.command == 'ensure':
+            created = ensure_partitions(months_ahead)
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+            return
+
+        retention = args.retention_months
+        if retention is None:
+            retention = int(app.config['ORDERS_RETENTION_MONTHS'])
+        archived = archive_partitions(retention, args.archive_dir or app.config['ORDERS_ARCHIVE_DIR'], args.dry_run)
+        for name, path, rows in archived:
+            print(f"{name}: would archive" if args.dry_run else f"{name}: {rows} rows -> {path}")
+        if not archived:
+            print('Nothing to archive')
+
+if __name__ == '__main__':
+    main()
@@ -1,43 +1,103 @@
-from flask import Blueprint, jsonify, request
-from app import db
-from app.models import Order
-
-orders_bp = Blueprint('orders', __name__)
-
-@orders_bp.route('/orders', methods=['GET'])
-def get_orders():
-    """Get all orders"""
-    orders = Order.query.all()
-    return jsonify([order.to_dict() for order in orders]), 200
-
-@orders_bp.route('/orders/<int:order_id>', methods=['GET'])
-def get_order(order_id):
-    """Get a specific order by ID"""
-    order = Order.query.get(order_id)
-    if not order:
-        return jsonify({'error': 'Order not found'}), 404
-    return jsonify(order.to_dict()), 200
-
-@orders_bp.route('/orders/user/<int:user_id>', methods=['GET'])
-def get_user_orders(user_id):
-    """Get all orders for a specific user"""
-    orders = Order.query.filter_by(user_id=user_id).all()
-    return jsonify([order.to_dict() for order in orders]), 200
-
-@orders_bp.route('/orders/<int:order_id>/status', methods=['PUT'])
-def update_order_status(order_id):
-    """Update order status"""
-    order = Order.query.get(order_id)
-    if not order:
-        return jsonify({'error': 'Order not found'}), 404
-    
-    data = request.get_json()
-    status = data.get('status')
-    
-    if not status:
-        return jsonify({'error': 'Status is required'}), 400
-    
-    order.status = status
-    db.session.commit()
-    
+from datetime import datetime, time, timedelta
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import case, select, update
+from app import db
+from app.models import Order
+from app.conditional import item_response
+from app.database import replica_reads
+from app.pagination import list_response, multi_get_response
+from app.stats import date_range
+
+orders_bp = Blueprint('orders', __name__)
+
+@orders_bp.route('/orders', methods=['GET'])
+@replica_reads
+def get_orders():
+    """Get all orders, optionally paginated (?after_id=&limit=) or streamed (?stream=json|ndjson)"""
+    if 'ids' in request.args:
+        return multi_get_response(Order, 'Order not found')
+    return list_response(select(Order), Order)
+
+@orders_bp.route('/orders/<int:order_id>', methods=['GET'])
+@replica_reads
+def get_order(order_id):
+    """Get a specific order by ID (honours If-None-Match / If-Modified-Since)"""
+    return item_response(Order, 'Order not found', Order.id == order_id)
+
+@orders_bp.route('/orders/user/<int:user_id>', methods=['GET'])
+@replica_reads
+def get_user_orders(user_id):
+    """Get a user's orders placed ?from=&to= (default: the last year); supports pagination/streaming args"""
+    try:
+        start, end = date_range(int(current_app.config['USER_ORDERS_DEFAULT_DAYS']))
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+    if start > end:
+        return jsonify({'error': 'from must not be after to'}), 400
+    
+    # Bounding created_at prunes the monthly partitions and keeps the
+    # (user_id, created_at) index scan to the requested window
+    stmt = select(Order).where(
+        Order.user_id == user_id,
+        Order.created_at >= datetime.combine(start, time.min),
+        Order.created_at < datetime.combine(end + timedelta(days=1), time.min)
+    )
+    return list_response(stmt, Order)
+
+@orders_bp.route('/orders/status', methods=['PUT'])
+def update_order_statuses():
+    """Apply many status changes ({"updates": [{"id": .., "status": ..}, ...]}) in one UPDATE"""
+    data = request.get_json(silent=True)
+    updates = data.get('updates') if isinstance(data, dict) else None
+    
+    if not updates or not isinstance(updates, list):
+        return jsonify({'error': 'Updates are required'}), 400
+    if len(updates) > int(current_app.config['MAX_STATUS_UPDATES']):
+        return jsonify({'error': f"At most {current_app.config['MAX_STATUS_UPDATES']} updates per request"}), 400
+    
+    # Later entries for the same order win, as if applied one by one
+    statuses = {}
+    for item in updates:
+        order_id = item.get('id') if isinstance(item, dict) else None
+        status = item.get('status') if isinstance(item, dict) else None
+        valid_id = isinstance(order_id, int) and not isinstance(order_id, bool)
+        if not valid_id or not isinstance(status, str) or not 0 < len(status) <= 50:
+            return jsonify({'error': 'Invalid update', 'update': item}), 400
+        statuses[order_id] = status
+    
+    # One CASE branch per distinct status keeps the statement small however many orders change
+    by_status = {}
+    for order_id, status in statuses.items():
+        by_status.setdefault(status, []).append(order_id)
+    stmt = (
+        update(Order)
+        .where(Order.id.in_(statuses))
+        .values(status=case(*[(Order.id.in_(ids), status) for status, ids in by_status.items()]))
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = set(db.session.scalars(stmt))
+    db.session.commit()
+    
+    return jsonify({
+        'updated': len(updated),
+        'not_found': sorted(set(statuses) - updated)
+    }), 200
+
+@orders_bp.route('/orders/<int:order_id>/status', methods=['PUT'])
+def update_order_status(order_id):
+    """Update order status"""
+    order = Order.query.get(order_id)
+    if not order:
+        return jsonify({'error': 'Order not found'}), 404
+    
+    data = request.get_json()
+    status = data.get('status')
+    
+    if not status:
+        return jsonify({'error': 'Status is required'}), 400
+    
+    order.status = status
+    db.session.commit()
+    
     return jsonify(order.to_dict()), 200
\ No newline at end of file
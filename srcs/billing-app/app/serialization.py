@@ -0,0 +1,53 @@
+from json.encoder import encode_basestring_ascii
+from flask import Response, current_app
+
+# Converters for the ORM-free read path. Each one renders a column value exactly as
+# jsonify renders the matching to_dict() value (ensure_ascii, float repr, isoformat).
+def _int(value):
+    return 'null' if value is None else int.__repr__(value)
+
+def _float(value):
+    return 'null' if value is None else float.__repr__(float(value))
+
+def _str(value):
+    return 'null' if value is None else encode_basestring_ascii(value)
+
+def _datetime(value):
+    return 'null' if value is None else f'"{value.isoformat()}"'
+
+CONVERTERS = {'int': _int, 'float': _float, 'str': _str, 'datetime': _datetime}
+
+_encoders = {}
+
+def compile_encoder(fields):
+    """Build a function that turns a column tuple into the JSON of its to_dict()"""
+    # jsonify sorts keys; the tuple stays in declaration order
+    ordered = sorted(enumerate(fields), key=lambda item: item[1][0])
+    parts = []
+    for position, (index, (name, kind)) in enumerate(ordered):
+        prefix = '{' if position == 0 else ','
+        parts.append(repr(f'{prefix}{encode_basestring_ascii(name)}:'))
+        parts.append(f'{kind}(row[{index}])')
+    parts.append("'}'")
+
+    source = f"def encode(row):\n    return ''.join(({', '.join(parts)}))\n"
+    namespace = dict(CONVERTERS)
+    exec(compile(source, '<row encoder>', 'exec'), namespace)
+    return namespace['encode']
+
+def model_encoder(model):
+    """Columns to select for a model and the compiled encoder for its rows"""
+    cached = _encoders.get(model)
+    if cached is None:
+        columns = [getattr(model, name) for name, _ in model.json_fields]
+        cached = (columns, compile_encoder(model.json_fields))
+        _encoders[model] = cached
+    return cached
+
+def encode_rows(rows, encode):
+    """Encode rows as a JSON array the way jsonify would"""
+    return '[' + ','.join([encode(row) for row in rows]) + ']\n'
+
+def json_body(body, status=200):
+    """Wrap already-encoded JSON in a response"""
+    return Response(body, status=status, mimetype=current_app.json.mimetype)
@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.database import replica_reads
+from app.models import DailySalesStats, MovieSalesStats
+
+stats_bp = Blueprint('stats', __name__)
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+def upsert(model, key, totals):
+    """Add per-key totals onto a rollup table with one INSERT ... ON CONFLICT DO UPDATE"""
+    dialect = db.session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+
+    # Sorted keys keep concurrent consumers locking rollup rows in the same order
+    rows = [
+        {key: value, 'order_count': count, 'quantity': quantity, 'total_amount': amount}
+        for value, (count, quantity, amount) in sorted(totals.items())
+    ]
+    stmt = insert(model).values(rows)
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={
+            'order_count': table.c.order_count + stmt.excluded.order_count,
+            'quantity': table.c.quantity + stmt.excluded.quantity,
+            'total_amount': table.c.total_amount + stmt.excluded.total_amount,
+            'updated_at': db.func.now()
+        }
+    )
+    db.session.execute(stmt)
+
+def record_sales(rows):
+    """Fold newly inserted order rows into the rollups; call inside the insert's transaction"""
+    by_movie = {}
+    by_day = {}
+    for row in rows:
+        amount = Decimal(str(row['total_amount']))
+        for totals, value in ((by_movie, row['movie_id']), (by_day, row['created_at'].date())):
+            count, quantity, total = totals.get(value, (0, 0, Decimal('0')))
+            totals[value] = (count + 1, quantity + row['quantity'], total + amount)
+
+    if by_movie:
+        upsert(MovieSalesStats, 'movie_id', by_movie)
+        upsert(DailySalesStats, 'day', by_day)
+
+def date_range(default_days):
+    """(start, end) from ?from=YYYY-MM-DD&to=YYYY-MM-DD; to defaults to today, from to default_days back.
+
+    Raises ValueError for malformed dates.
+    """
+    end = date.fromisoformat(request.args['to']) if 'to' in request.args else datetime.utcnow().date()
+    start = (date.fromisoformat(request.args['from']) if 'from' in request.args
+             else end - timedelta(days=default_days - 1))
+    return start, end
+
+@stats_bp.route('/movies/<int:movie_id>', methods=['GET'])
+@replica_reads
+def get_movie_stats(movie_id):
+    """Order count, quantity and revenue for one movie"""
+    stats = db.session.get(MovieSalesStats, movie_id)
+    if not stats:
+        stats = MovieSalesStats(movie_id=movie_id, order_count=0, quantity=0, total_amount=0)
+    return jsonify(stats.to_dict()), 200
+
+@stats_bp.route('/daily', methods=['GET'])
+@replica_reads
+def get_daily_stats():
+    """Per-day order count, quantity and revenue for ?from=YYYY-MM-DD&to=YYYY-MM-DD"""
+    try:
+        start, end = date_range(DEFAULT_DAYS)
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+
+    if start > end:
+        return jsonify({'error': 'from must not be after to'}), 400
+    if (end - start).days >= MAX_DAYS:
+        return jsonify({'error': f'Range is limited to {MAX_DAYS} days'}), 400
+
+    days = db.session.scalars(
+        select(DailySalesStats)
+        .where(DailySalesStats.day.between(start, end))
+        .order_by(DailySalesStats.day)
+    ).all()
+    return jsonify([day.to_dict() for day in days]), 200
@@ -0,0 +1,82 @@
+import logging
+import os
+import signal
+import tempfile
+import time
+from multiprocessing import Process
+
+# Consumer processes write their metrics to files here and this supervisor serves the
+# merged view. prometheus_client picks its value store when it is first imported, so
+# this has to run before the imports below (hence noqa: E402).
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='billing-consumer-')
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.consumer import start_consumer  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('billing-consumer')
+
+# Seconds before a consumer process that exited (e.g. lost its broker connection) is replaced
+RESTART_DELAY = 5
+
+def run_consumer():
+    """Entry point of one consumer process"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    start_consumer()
+
+def spawn(index):
+    process = Process(target=run_consumer, name=f"consumer-{index}", daemon=True)
+    process.start()
+    return process
+
+def main():
+    """Run CONSUMER_PROCESSES consumers, replacing any that exit, and serve their metrics"""
+    count = int(Config.CONSUMER_PROCESSES)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(int(Config.CONSUMER_METRICS_PORT), registry=registry)
+
+    processes = [spawn(index) for index in range(count)]
+    restart_at = {}
+    logger.info(f"Started {count} consumer processes")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        time.sleep(1)
+        for index, process in enumerate(processes):
+            if process.is_alive():
+                continue
+            if index not in restart_at:
+                multiprocess.mark_process_dead(process.pid)
+                logger.warning(f"Consumer {index} exited with code {process.exitcode}; "
+                               f"restarting in {RESTART_DELAY}s")
+                restart_at[index] = time.monotonic() + RESTART_DELAY
+            elif time.monotonic() >= restart_at[index]:
+                del restart_at[index]
+                processes[index] = spawn(index)
+
+    # Unacknowledged deliveries go back to the queue when a consumer's connection closes
+    logger.info("Stopping consumer processes")
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=10)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import multiprocessing
+import os
+import shutil
+
+# Pre-fork serving: WEB_WORKERS processes with WEB_THREADS threads each.
+# Each worker has its own SQLAlchemy pool, so workers x threads bounds DB concurrency.
+wsgi_app = 'server:app'
+bind = f"0.0.0.0:{os.getenv('APP_PORT', '8080')}"
+workers = int(os.getenv('WEB_WORKERS', str(multiprocessing.cpu_count())))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread'
+timeout = int(os.getenv('WEB_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Workers write their metrics to files here and /metrics merges them (see app/metrics.py)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,14 +1,15 @@
-import os
-import threading
-from app import create_app
-from app.consumer import start_consumer
-
-app = create_app()
-
-# Start RabbitMQ consumer in a separate thread
-consumer_thread = threading.Thread(target=start_consumer, daemon=True)
-consumer_thread.start()
-
-if __name__ == '__main__':
-    port = int(os.getenv('APP_PORT', 8080))
+import os
+import threading
+from app import create_app
+from app.consumer import start_consumer
+
+app = create_app()
+
+if __name__ == '__main__':
+    # Development server: consume in a background thread of the same process.
+    # Under gunicorn the consumer runs on its own (python consumer.py)
+    consumer_thread = threading.Thread(target=start_consumer, daemon=True)
+    consumer_thread.start()
+    
+    port = int(os.getenv('APP_PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -1,19 +1,60 @@
--- Create orders table
-CREATE TABLE IF NOT EXISTS orders (
-    id SERIAL PRIMARY KEY,
-    user_id INTEGER NOT NULL,
-    movie_id INTEGER NOT NULL,
-    movie_title VARCHAR(255) NOT NULL,
-    quantity INTEGER NOT NULL DEFAULT 1,
-    price DECIMAL(10, 2) NOT NULL,
-    total_amount DECIMAL(10, 2) NOT NULL,
-    status VARCHAR(50) DEFAULT 'pending',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- Create index on user_id for faster queries
-CREATE INDEX idx_orders_user_id ON orders(user_id);
-
--- Create index on status
-CREATE INDEX idx_orders_status ON orders(status);
\ No newline at end of file
+-- Create orders table, range-partitioned by month on created_at so that date-bounded
+-- reads only touch the months they ask for and old months can be detached and archived
+-- whole (python -m app.partitions in billing-app). The partition key has to be part
+-- of the primary key.
+CREATE TABLE IF NOT EXISTS orders (
+    id SERIAL,
+    user_id INTEGER NOT NULL,
+    movie_id INTEGER NOT NULL,
+    movie_title VARCHAR(255) NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    price DECIMAL(10, 2) NOT NULL,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside every monthly partition; should stay empty while the
+-- billing-partitions service ("python -m app.partitions maintain") is running
+CREATE TABLE IF NOT EXISTS orders_default PARTITION OF orders DEFAULT;
+
+-- Monthly partitions from last month to a year ahead
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    FOR offset_months IN -1..12 LOOP
+        month_start := date_trunc('month', CURRENT_DATE)::date + make_interval(months => offset_months);
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF orders FOR VALUES FROM (%L) TO (%L)',
+            'orders_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+-- A user's orders are always read within a created_at window
+CREATE INDEX idx_orders_user_created ON orders(user_id, created_at DESC);
+
+-- Create index on status
+CREATE INDEX idx_orders_status ON orders(status);
+
+-- Sales rollups, updated by the consumer in the same transaction as the orders
+CREATE TABLE IF NOT EXISTS movie_sales_stats (
+    movie_id INTEGER PRIMARY KEY,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS daily_sales_stats (
+    day DATE PRIMARY KEY,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
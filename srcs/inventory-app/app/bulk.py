@@ -0,0 +1,153 @@
+import csv
+import json
+import logging
+from decimal import Decimal, InvalidOperation
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import Movie
+
+logger = logging.getLogger(__name__)
+
+# Content types accepted by POST /movies/bulk
+IMPORT_FORMATS = {
+    'application/x-ndjson': 'ndjson',
+    'text/csv': 'csv'
+}
+
+MAX_PRICE = Decimal('100000000')
+
+def decoded_lines(stream):
+    """Read a binary request body line by line as text, dropping a leading BOM"""
+    for number, raw in enumerate(stream):
+        line = raw.decode('utf-8')
+        yield line.removeprefix('\ufeff') if number == 0 else line
+
+def read_records(stream, fmt):
+    """Yield (line, record, error) for each record of an NDJSON or CSV (with header) body"""
+    text = decoded_lines(stream)
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            yield line, json.loads(raw), None
+        except ValueError:
+            yield line, None, 'Invalid JSON'
+
+def movie_values(record):
+    """Validate one imported record; returns (values, None) or (None, error)"""
+    if not isinstance(record, dict):
+        return None, 'Expected an object'
+
+    missing = [field for field in ('title', 'price', 'stock') if record.get(field) in (None, '')]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+
+    if not isinstance(record['title'], str):
+        return None, 'title must be a string'
+    title = record['title'].strip()
+    if not title or len(title) > 255:
+        return None, 'title must be 1-255 characters'
+
+    try:
+        price = Decimal(str(record['price']))
+    except InvalidOperation:
+        return None, 'price must be a number'
+    if not price.is_finite() or price < 0 or price >= MAX_PRICE:
+        return None, 'price must be between 0 and 99999999.99'
+
+    try:
+        stock = int(str(record['stock']))
+    except ValueError:
+        return None, 'stock must be an integer'
+    if stock < 0:
+        return None, 'stock must not be negative'
+
+    description = record.get('description') or ''
+    if not isinstance(description, str):
+        return None, 'description must be a string'
+
+    return {
+        'title': title,
+        'description': description,
+        'price': price,
+        'stock': stock
+    }, None
+
+class ImportResult:
+    """Counts and (capped) per-line errors of one bulk import"""
+
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, error):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': error})
+
+    def to_dict(self):
+        return {
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+def flush(batch, result):
+    """Insert a batch with one multi-row INSERT and commit; on failure retry row by row to find the bad lines"""
+    if not batch:
+        return
+    try:
+        db.session.execute(insert(Movie), [values for _, values in batch])
+        db.session.commit()
+        result.inserted += len(batch)
+        return
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.warning(f"Bulk insert of {len(batch)} rows failed, retrying one by one: {str(e)}")
+
+    for line, values in batch:
+        try:
+            db.session.execute(insert(Movie), [values])
+            db.session.commit()
+            result.inserted += 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            result.fail(line, str(getattr(e, 'orig', e)).strip())
+
+def import_movies(stream, fmt):
+    """Load movies from a streamed body in batches; invalid lines are skipped and reported"""
+    batch_size = int(current_app.config['BULK_IMPORT_BATCH_SIZE'])
+    result = ImportResult(int(current_app.config['BULK_IMPORT_MAX_ERRORS']))
+
+    batch = []
+    try:
+        for line, record, error in read_records(stream, fmt):
+            values = None
+            if error is None:
+                values, error = movie_values(record)
+            if error is not None:
+                result.fail(line, error)
+                continue
+
+            batch.append((line, values))
+            if len(batch) >= batch_size:
+                flush(batch, result)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Keep what was read so far; the rest of the body cannot be parsed
+        result.fail(None, f"Unreadable input: {str(e)}")
+
+    flush(batch, result)
+    return result.to_dict()
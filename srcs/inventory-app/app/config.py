@@ -1,11 +1,40 @@
-import os
-
-class Config:
-    DB_HOST = os.getenv('DB_HOST', 'localhost')
-    DB_PORT = os.getenv('DB_PORT', '5432')
-    DB_NAME = os.getenv('DB_NAME', 'inventory_db')
-    DB_USER = os.getenv('DB_USER', 'postgres')
-    DB_PASSWORD = os.getenv('DB_PASSWORD', 'postgres')
-    
-    SQLALCHEMY_DATABASE_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+import os
+
+class Config:
+    DB_HOST = os.getenv('DB_HOST', 'localhost')
+    DB_PORT = os.getenv('DB_PORT', '5432')
+    DB_NAME = os.getenv('DB_NAME', 'inventory_db')
+    DB_USER = os.getenv('DB_USER', 'postgres')
+    DB_PASSWORD = os.getenv('DB_PASSWORD', 'postgres')
+    
+    # DATABASE_URL overrides the DB_* settings (e.g. sqlite:///... for local benchmarks)
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        'DATABASE_URL',
+        f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Optional streaming read replica: DATABASE_REPLICA_URL, or DB_REPLICA_HOST with the
+    # DB_* credentials. Read-only routes (@replica_reads) use it; writes stay on the primary.
+    DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST', '')
+    SQLALCHEMY_REPLICA_URI = os.getenv(
+        'DATABASE_REPLICA_URL',
+        f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_REPLICA_HOST}:{DB_PORT}/{DB_NAME}" if DB_REPLICA_HOST else ''
+    )
+    
+    # Connection pool per worker process and engine (see app.database). A worker opens at most
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections; DB_STATEMENT_TIMEOUT_MS=0 disables the timeout.
+    DB_POOL_SIZE = os.getenv('DB_POOL_SIZE', '5')
+    DB_MAX_OVERFLOW = os.getenv('DB_MAX_OVERFLOW', '10')
+    DB_POOL_TIMEOUT = os.getenv('DB_POOL_TIMEOUT', '30')
+    DB_POOL_RECYCLE = os.getenv('DB_POOL_RECYCLE', '1800')
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true')
+    DB_STATEMENT_TIMEOUT_MS = os.getenv('DB_STATEMENT_TIMEOUT_MS', '0')
+    
+    # List endpoints: largest page for ?limit= and rows fetched per batch when streaming
+    MAX_PAGE_SIZE = os.getenv('MAX_PAGE_SIZE', '1000')
+    STREAM_BATCH_SIZE = os.getenv('STREAM_BATCH_SIZE', '500')
+    
+    # POST /movies/bulk: rows per multi-row INSERT/commit and per-line errors kept in the report
+    BULK_IMPORT_BATCH_SIZE = os.getenv('BULK_IMPORT_BATCH_SIZE', '1000')
+    BULK_IMPORT_MAX_ERRORS = os.getenv('BULK_IMPORT_MAX_ERRORS', '1000')
\ No newline at end of file
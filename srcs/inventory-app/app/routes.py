@@ -1,91 +1,227 @@
-from flask import Blueprint, jsonify, request
-from app import db
-from app.models import Movie
-
-movies_bp = Blueprint('movies', __name__)
-
-@movies_bp.route('/movies', methods=['GET'])
-def get_movies():
-    """Get all movies"""
-    movies = Movie.query.all()
-    return jsonify([movie.to_dict() for movie in movies]), 200
-
-@movies_bp.route('/movies/<int:movie_id>', methods=['GET'])
-def get_movie(movie_id):
-    """Get a specific movie by ID"""
-    movie = Movie.query.get(movie_id)
-    if not movie:
-        return jsonify({'error': 'Movie not found'}), 404
-    return jsonify(movie.to_dict()), 200
-
-@movies_bp.route('/movies', methods=['POST'])
-def create_movie():
-    """Create a new movie"""
-    data = request.get_json()
-    
-    if not data or not all(k in data for k in ['title', 'price', 'stock']):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    movie = Movie(
-        title=data['title'],
-        description=data.get('description', ''),
-        price=data['price'],
-        stock=data['stock']
-    )
-    
-    db.session.add(movie)
-    db.session.commit()
-    
-    return jsonify(movie.to_dict()), 201
-
-@movies_bp.route('/movies/<int:movie_id>', methods=['PUT'])
-def update_movie(movie_id):
-    """Update a movie"""
-    movie = Movie.query.get(movie_id)
-    if not movie:
-        return jsonify({'error': 'Movie not found'}), 404
-    
-    data = request.get_json()
-    
-    if 'title' in data:
-        movie.title = data['title']
-    if 'description' in data:
-        movie.description = data['description']
-    if 'price' in data:
-        movie.price = data['price']
-    if 'stock' in data:
-        movie.stock = data['stock']
-    
-    db.session.commit()
-    
-    return jsonify(movie.to_dict()), 200
-
-@movies_bp.route('/movies/<int:movie_id>', methods=['DELETE'])
-def delete_movie(movie_id):
-    """Delete a movie"""
-    movie = Movie.query.get(movie_id)
-    if not movie:
-        return jsonify({'error': 'Movie not found'}), 404
-    
-    db.session.delete(movie)
-    db.session.commit()
-    
-    return jsonify({'message': 'Movie deleted successfully'}), 200
-
-@movies_bp.route('/movies/<int:movie_id>/reduce-stock', methods=['POST'])
-def reduce_stock(movie_id):
-    """Reduce stock of a movie (used when order is placed)"""
-    movie = Movie.query.get(movie_id)
-    if not movie:
-        return jsonify({'error': 'Movie not found'}), 404
-    
-    data = request.get_json()
-    quantity = data.get('quantity', 1)
-    
-    if movie.stock < quantity:
-        return jsonify({'error': 'Insufficient stock'}), 400
-    
-    movie.stock -= quantity
-    db.session.commit()
-    
-    return jsonify(movie.to_dict()), 200
\ No newline at end of file
+import re
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import func, literal_column, or_, select, update
+from app import db
+from app.bulk import IMPORT_FORMATS, import_movies
+from app.database import replica_reads
+from app.models import Movie
+from app.conditional import item_response
+from app.pagination import list_response, multi_get_response
+from app.serialization import encode_rows, json_body, model_encoder
+
+movies_bp = Blueprint('movies', __name__)
+
+@movies_bp.route('/movies', methods=['GET'])
+@replica_reads
+def get_movies():
+    """Get all movies, optionally paginated (?after_id=&limit=) or streamed (?stream=json|ndjson)"""
+    if 'ids' in request.args:
+        return multi_get_response(Movie, 'Movie not found')
+    return list_response(select(Movie), Movie)
+
+def search_conditions(query):
+    """WHERE clause and rank for a search query on the current database"""
+    if db.session.get_bind().dialect.name != 'postgresql':
+        # Plain substring match for SQLite development databases; LIKE wildcards in q match literally
+        escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{escaped}%"
+        return or_(
+            Movie.title.ilike(pattern, escape='\\'),
+            Movie.description.ilike(pattern, escape='\\')
+        ), None
+
+    # Every word as a prefix, so "matr rel" finds "The Matrix Reloaded"
+    words = re.findall(r'\w+', query)
+    ts_query = func.to_tsquery('english', ' & '.join(f"{word}:*" for word in words))
+    search_vector = literal_column('movies.search_vector')
+
+    # The trigram match catches misspelled titles the full-text match misses
+    condition = or_(search_vector.op('@@')(ts_query), Movie.title.op('%>')(query))
+    rank = func.ts_rank_cd(search_vector, ts_query) + func.word_similarity(query, Movie.title)
+    return condition, rank
+
+@movies_bp.route('/movies/search', methods=['GET'])
+@replica_reads
+def search_movies():
+    """Ranked search over title and description (?q=&min_price=&max_price=&min_stock=&limit=)"""
+    query = request.args.get('q', '').strip()
+    if not re.search(r'\w', query):
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    
+    limit = request.args.get('limit', 20, type=int)
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    limit = min(limit, int(current_app.config['MAX_PAGE_SIZE']))
+    
+    condition, rank = search_conditions(query)
+    columns, encode = model_encoder(Movie)
+    stmt = select(*columns).where(condition)
+    
+    min_price = request.args.get('min_price', type=float)
+    max_price = request.args.get('max_price', type=float)
+    min_stock = request.args.get('min_stock', type=int)
+    if min_price is not None:
+        stmt = stmt.where(Movie.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Movie.price <= max_price)
+    if min_stock is not None:
+        stmt = stmt.where(Movie.stock >= min_stock)
+    
+    if rank is not None:
+        stmt = stmt.order_by(rank.desc(), Movie.id)
+    else:
+        stmt = stmt.order_by(Movie.id)
+    
+    rows = db.session.execute(stmt.limit(limit)).all()
+    return json_body(encode_rows(rows, encode)), 200
+
+@movies_bp.route('/movies/<int:movie_id>', methods=['GET'])
+@replica_reads
+def get_movie(movie_id):
+    """Get a specific movie by ID (honours If-None-Match / If-Modified-Since)"""
+    return item_response(Movie, 'Movie not found', Movie.id == movie_id)
+
+@movies_bp.route('/movies', methods=['POST'])
+def create_movie():
+    """Create a new movie"""
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['title', 'price', 'stock']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    movie = Movie(
+        title=data['title'],
+        description=data.get('description', ''),
+        price=data['price'],
+        stock=data['stock']
+    )
+    
+    db.session.add(movie)
+    db.session.commit()
+    
+    return jsonify(movie.to_dict()), 201
+
+@movies_bp.route('/movies/bulk', methods=['POST'])
+def bulk_import_movies():
+    """Import movies from a streamed NDJSON or CSV body; bad lines are reported, not fatal"""
+    fmt = IMPORT_FORMATS.get(request.mimetype)
+    if fmt is None:
+        return jsonify({'error': 'Content-Type must be application/x-ndjson or text/csv'}), 415
+    
+    return jsonify(import_movies(request.stream, fmt)), 200
+
+@movies_bp.route('/movies/<int:movie_id>', methods=['PUT'])
+def update_movie(movie_id):
+    """Update a movie"""
+    movie = Movie.query.get(movie_id)
+    if not movie:
+        return jsonify({'error': 'Movie not found'}), 404
+    
+    data = request.get_json()
+    
+    if 'title' in data:
+        movie.title = data['title']
+    if 'description' in data:
+        movie.description = data['description']
+    if 'price' in data:
+        movie.price = data['price']
+    if 'stock' in data:
+        movie.stock = data['stock']
+    
+    db.session.commit()
+    
+    return jsonify(movie.to_dict()), 200
+
+@movies_bp.route('/movies/<int:movie_id>', methods=['DELETE'])
+def delete_movie(movie_id):
+    """Delete a movie"""
+    movie = Movie.query.get(movie_id)
+    if not movie:
+        return jsonify({'error': 'Movie not found'}), 404
+    
+    db.session.delete(movie)
+    db.session.commit()
+    
+    return jsonify({'message': 'Movie deleted successfully'}), 200
+
+def parse_quantity(value):
+    """Validate an order quantity; returns None when it is not a positive integer"""
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        return None
+    return value
+
+def reserve(movie_id, quantity):
+    """Decrement stock in one conditional UPDATE; returns the updated Movie or None"""
+    stmt = (
+        update(Movie)
+        .where(Movie.id == movie_id, Movie.stock >= quantity)
+        .values(stock=Movie.stock - quantity)
+        .returning(Movie)
+    )
+    return db.session.scalar(stmt)
+
+def reservation_failure(movie_id):
+    """Explain why a reservation matched no row: unknown movie or not enough stock"""
+    available = db.session.scalar(select(Movie.stock).where(Movie.id == movie_id))
+    if available is None:
+        return {'error': 'Movie not found', 'movie_id': movie_id}, 404
+    return {'error': 'Insufficient stock', 'movie_id': movie_id, 'available': available}, 400
+
+@movies_bp.route('/movies/<int:movie_id>/reduce-stock', methods=['POST'])
+def reduce_stock(movie_id):
+    """Reduce stock of a movie (used when order is placed)"""
+    data = request.get_json()
+    quantity = parse_quantity(data.get('quantity', 1))
+    
+    if quantity is None:
+        return jsonify({'error': 'Invalid quantity'}), 400
+    
+    movie = reserve(movie_id, quantity)
+    if movie is None:
+        db.session.rollback()
+        body, status = reservation_failure(movie_id)
+        return jsonify(body), status
+    
+    db.session.commit()
+    
+    return jsonify(movie.to_dict()), 200
+
+@movies_bp.route('/movies/reserve', methods=['POST'])
+def reserve_stock():
+    """Reserve stock for several movies in one transaction (all or nothing)"""
+    data = request.get_json()
+    items = data.get('items') if isinstance(data, dict) else None
+    
+    if not items or not isinstance(items, list):
+        return jsonify({'error': 'Items are required'}), 400
+    
+    # Merge duplicate lines so each movie is updated once
+    totals = {}
+    for item in items:
+        quantity = parse_quantity(item.get('quantity', 1)) if isinstance(item, dict) else None
+        if quantity is None or not isinstance(item.get('movie_id'), int):
+            return jsonify({'error': 'Invalid item', 'item': item}), 400
+        totals[item['movie_id']] = totals.get(item['movie_id'], 0) + quantity
+    
+    # Lock rows in id order so concurrent reservations cannot deadlock
+    reserved = {}
+    for movie_id in sorted(totals):
+        movie = reserve(movie_id, totals[movie_id])
+        if movie is None:
+            db.session.rollback()
+            body, status = reservation_failure(movie_id)
+            return jsonify(body), status
+        reserved[movie_id] = movie.to_dict()
+    
+    db.session.commit()
+    
+    return jsonify({
+        'items': [
+            {
+                'movie_id': item['movie_id'],
+                'quantity': item.get('quantity', 1),
+                'movie': reserved[item['movie_id']]
+            }
+            for item in items
+        ]
+    }), 200
\ No newline at end of file
@@ -1,8 +1,8 @@
-import os
-from app import create_app
-
-app = create_app()
-
-if __name__ == '__main__':
-    port = int(os.getenv('APP_PORT', 8080))
+import os
+from app import create_app
+
+app = create_app()
+
+if __name__ == '__main__':
+    port = int(os.getenv('APP_PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
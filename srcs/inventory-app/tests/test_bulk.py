@@ -0,0 +1,22 @@
+import pytest
+
+from app.bulk import movie_values
+
+VALID = {'title': 'Alien', 'price': '9.99', 'stock': 3}
+
+
+def test_accepts_valid_record():
+    values, error = movie_values(dict(VALID, title='  Alien  '))
+    assert error is None
+    assert values['title'] == 'Alien'
+    assert values['description'] == ''
+
+
+@pytest.mark.parametrize('title', [['x'], 42, 4.5, {'en': 'Alien'}, True])
+def test_rejects_non_string_title(title):
+    assert movie_values(dict(VALID, title=title)) == (None, 'title must be a string')
+
+
+@pytest.mark.parametrize('description', [['x'], 42, {'en': 'Scary'}])
+def test_rejects_non_string_description(description):
+    assert movie_values(dict(VALID, description=description)) == (None, 'description must be a string')